@@ -0,0 +1,176 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import platform
+import sys
+import time
+
+from formulas import Variable, Negation, Implication
+
+# Замеры автоматического вывода на фиксированном наборе задач.
+# Каждая задача выполняется в отдельном процессе, чтобы пиковая память
+# не накапливалась между задачами и зависшую задачу можно было прервать.
+#
+#   python benchmark.py run -o bench.json
+#   python benchmark.py compare old.json new.json
+
+
+def variable(k):
+    return Variable(chr(ord('A') + k))
+
+
+def task4_identity():
+    # Тождество из задания 4 в README
+    A, B, C = variable(0), variable(1), variable(2)
+    X = Implication(B, Implication(Implication(A, Implication(B, C)), Implication(Implication(A, B), Implication(A, C))))
+    return Implication(Implication(A, B),
+                       Implication(A, Implication(Implication(Negation(X), Negation(A)),
+                                                  Implication(Implication(Negation(X), A), X))))
+
+
+def weakening(n):
+    # A → (B → (C → ... → A)) с n лишними посылками
+    result = variable(0)
+    for k in range(n, 0, -1):
+        result = Implication(variable(k), result)
+    return Implication(variable(0), result)
+
+
+def double_negation(n):
+    # ¬¬...¬A → A с 2n отрицаниями
+    result = variable(0)
+    for _ in range(2 * n):
+        result = Negation(result)
+    return Implication(result, variable(0))
+
+
+def syllogism_chain(n):
+    # (A → B) → ((B → C) → ... → (A → последняя))
+    result = Implication(variable(0), variable(n))
+    for k in range(n - 1, -1, -1):
+        result = Implication(Implication(variable(k), variable(k + 1)), result)
+    return result
+
+
+def corpus():
+    # Имя задачи -> (вид, описание задачи для дочернего процесса)
+    import task1
+    cases = {'task4': ('proof', task4_identity())}
+    for k, expr in enumerate(task1.target):
+        cases[f'task1_target_{k}'] = ('proof', expr)
+    # Для проверок совместности вместо формулы - метод task3.check_consistency
+    cases['task3_apples'] = ('consistency', 'resolution')
+    cases['task3_apples_sat'] = ('consistency', 'sat')
+    for n in (1, 2, 3, 4):
+        cases[f'weakening_{n}'] = ('proof', weakening(n))
+    for n in (1, 2):
+        cases[f'double_negation_{n}'] = ('proof', double_negation(n))
+    for n in (2, 3):
+        cases[f'syllogism_chain_{n}'] = ('proof', syllogism_chain(n))
+    return cases
+
+
+def run_case(kind, expr, timeout, queue):
+    import task1
+    start = time.perf_counter()
+    result = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        if kind == 'proof':
+            proofer = task1.Auto_proof()
+            outcome = proofer.proof([expr], time_limit=timeout)
+            result.update(status=outcome.status,
+                          steps=outcome.stats['steps'],
+                          identities=outcome.stats['identities'],
+                          generated=outcome.stats['generated'],
+                          pairs_tried=outcome.stats['pairs_tried'])
+        else:
+            import task3
+            inconsistent = task3.check_consistency(task3.clauses, method=expr)
+            result.update(status='inconsistent' if inconsistent else 'consistent')
+    result['wall'] = time.perf_counter() - start
+    # Пиковая память процесса в мегабайтах (0, если модуля resource нет)
+    result['peak_memory_mb'] = task1.Auto_proof.memory_mb()
+    queue.put(result)
+
+
+def run(output, timeout, only):
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name, (kind, expr) in corpus().items():
+        if only and not any(part in name for part in only):
+            continue
+        queue = context.Queue()
+        process = context.Process(target=run_case, args=(kind, expr, timeout, queue))
+        start = time.perf_counter()
+        process.start()
+        # Доказатель сам останавливается по time_limit; запас - на запуск процесса и зависание
+        process.join(timeout + 10)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            result = {'status': 'timeout', 'wall': time.perf_counter() - start}
+        elif process.exitcode != 0:
+            result = {'status': 'error', 'wall': time.perf_counter() - start}
+        else:
+            result = queue.get()
+        result['name'] = name
+        results.append(result)
+        print(f"{name:24} {result['status']:12} {result['wall']:9.3f} s", file=sys.stderr)
+    report = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'timeout': timeout,
+        'cases': results,
+    }
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=1)
+
+
+def compare(old_path, new_path, threshold, min_wall):
+    # Возвращает число регрессий: замедление больше threshold или потеря доказательства
+    with open(old_path, encoding='utf-8') as file:
+        old = {case['name']: case for case in json.load(file)['cases']}
+    with open(new_path, encoding='utf-8') as file:
+        new = {case['name']: case for case in json.load(file)['cases']}
+    regressions = 0
+    for name, case in new.items():
+        before = old.get(name)
+        if before is None:
+            continue
+        mark = ''
+        if before['status'] != case['status']:
+            mark = f"статус {before['status']} -> {case['status']}"
+            if before['status'] in ('proved', 'inconsistent', 'consistent'):
+                regressions += 1
+        elif max(before['wall'], case['wall']) >= min_wall and case['wall'] > before['wall'] * (1 + threshold):
+            mark = 'ЗАМЕДЛЕНИЕ'
+            regressions += 1
+        print(f"{name:24} {before['wall']:9.3f} -> {case['wall']:9.3f} s  {mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры времени автоматического вывода')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='выполнить все задачи и записать результаты в JSON')
+    run_parser.add_argument('-o', '--output', default='bench_output.json')
+    run_parser.add_argument('--timeout', type=float, default=60, help='предел на задачу, секунды')
+    run_parser.add_argument('--only', nargs='*', help='выполнять только задачи, имя которых содержит подстроку')
+    compare_parser = commands.add_parser('compare', help='сравнить два файла с результатами')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=0.2, help='допустимое относительное замедление')
+    compare_parser.add_argument('--min-wall', type=float, default=0.05,
+                                help='задачи быстрее этого порога (секунды) не сравниваются по времени')
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args.output, args.timeout, args.only)
+    else:
+        sys.exit(1 if compare(args.old, args.new, args.threshold, args.min_wall) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from formulas import Variable, Negation, Implication, Disjunction
+
+# Снимок состояния Auto_proof в двоичном файле.
+#
+# Формат: 'APCK', версия и длина заголовка (uint32), заголовок JSON (ключ набора
+# аксиом, имена переменных и правил, счётчики, расположение секций), затем выровненные
+# секции int32. Формулы хранятся таблицей узлов, где потомки идут раньше
+# родителей: вид узла (0 - переменная, 1 - отрицание, 2 - импликация,
+# 3 - дизъюнкция) и два аргумента (номер имени или номера потомков).
+# Файл отображается в память, и записи вывода раскрываются только при обращении,
+# так что тёплый старт не разбирает и не создаёт заново весь граф вывода.
+
+MAGIC = b'APCK'
+VERSION = 3
+_PREFIX = struct.Struct('<4sII')
+
+VAR, NEG, IMP, DIS = 0, 1, 2, 3
+
+SECTIONS = ('node_kind', 'node_a', 'node_b',
+            'deriv_formula', 'deriv_rule', 'deriv_first', 'deriv_second',
+            'identities', 'active', 'passive_formula', 'passive_age', 'passive_weight',
+            'subgoal_goal', 'subgoal_parent', 'subgoal_major')
+
+
+class _Encoder:
+    # Нумерует узлы формул в порядке "потомки раньше родителей"
+    def __init__(self):
+        self.numbers = {}
+        self.names = {}
+        self.kind = array('i')
+        self.a = array('i')
+        self.b = array('i')
+
+    def add(self, expr):
+        stack = [expr]
+        while stack:
+            node = stack[-1]
+            if node in self.numbers:
+                stack.pop()
+                continue
+            if isinstance(node, Variable):
+                self._append(node, VAR, self.names.setdefault(node.name, len(self.names)), -1)
+                stack.pop()
+                continue
+            if isinstance(node, Negation):
+                parts = (node.expression,)
+            elif isinstance(node, Implication):
+                parts = (node.antecedent, node.consequent)
+            else:
+                parts = (node.left, node.right)
+            pending = [part for part in parts if part not in self.numbers]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            kind = NEG if isinstance(node, Negation) else IMP if isinstance(node, Implication) else DIS
+            numbers = [self.numbers[part] for part in parts]
+            self._append(node, kind, numbers[0], numbers[1] if len(numbers) > 1 else -1)
+        return self.numbers[expr]
+
+    def _append(self, node, kind, a, b):
+        self.numbers[node] = len(self.kind)
+        self.kind.append(kind)
+        self.a.append(a)
+        self.b.append(b)
+
+
+def save(proofer, path):
+    encoder = _Encoder()
+    rules = {}
+    data = {name: array('i') for name in SECTIONS}
+    for k in range(len(proofer.derivations)):
+        expr, rule, parents = proofer.derivations[k]
+        data['deriv_formula'].append(encoder.add(expr))
+        data['deriv_rule'].append(rules.setdefault(rule, len(rules)))
+        data['deriv_first'].append(parents[0] if parents else -1)
+        data['deriv_second'].append(parents[1] if len(parents) > 1 else -1)
+    for expr in proofer.identities:
+        data['identities'].append(encoder.add(expr))
+    for expr in proofer.active:
+        data['active'].append(encoder.add(expr))
+    # Вес в очереди считается при добавлении формулы (и зависит от тогдашних подцелей),
+    # поэтому сохраняется, а не пересчитывается
+    weights = {age: weight for weight, age, expr in proofer.passive_by_weight if proofer.passive.get(expr) == age}
+    for expr, age in proofer.passive.items():
+        data['passive_formula'].append(encoder.add(expr))
+        data['passive_age'].append(age)
+        data['passive_weight'].append(weights[age])
+    # Подцели - по строке на связь (подцель, родитель, большая посылка); -1 - нет родителя у цели
+    for goal, links in proofer.subgoals.items():
+        for parent, major in links:
+            data['subgoal_goal'].append(encoder.add(goal))
+            data['subgoal_parent'].append(-1 if parent is None else encoder.add(parent))
+            data['subgoal_major'].append(-1 if major is None else encoder.add(major))
+    data['node_kind'], data['node_a'], data['node_b'] = encoder.kind, encoder.a, encoder.b
+
+    header = {
+        'byteorder': sys.byteorder,
+        'axioms': proofer.library_key,
+        'names': list(encoder.names),
+        'rules': list(rules),
+        'counters': {name: getattr(proofer, name) for name in
+                     ('age', 'picks', 'steps', 'pairs_tried', 'generated', 'discarded', 'pick_given_ratio',
+                      'max_subgoal_size')},
+        'sections': {},
+    }
+    # Заголовок записывается после того, как известны смещения секций
+    offset = 0
+    for name in SECTIONS:
+        header['sections'][name] = [offset, len(data[name])]
+        offset += 4 * len(data[name])
+    raw_header = json.dumps(header, ensure_ascii=False).encode('utf-8')
+    start = _PREFIX.size + len(raw_header)
+    padding = -start % 8
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(_PREFIX.pack(MAGIC, VERSION, len(raw_header)))
+        file.write(raw_header)
+        file.write(b'\0' * padding)
+        for name in SECTIONS:
+            data[name].tofile(file)
+        file.flush()
+        os.fsync(file.fileno())
+    # Замена атомарна: прерванная запись не портит предыдущий снимок
+    os.replace(temporary, path)
+
+
+class Snapshot:
+    # Отображённый в память снимок; формулы раскрываются по требованию
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, header_size = _PREFIX.unpack_from(self.mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: не снимок Auto_proof версии {VERSION}")
+        self.header = json.loads(self.mmap[_PREFIX.size:_PREFIX.size + header_size].decode('utf-8'))
+        if self.header['byteorder'] != sys.byteorder:
+            raise ValueError(f"{path}: снимок записан с другим порядком байтов")
+        start = _PREFIX.size + header_size
+        start += -start % 8
+        view = memoryview(self.mmap)
+        self.sections = {}
+        for name, (offset, length) in self.header['sections'].items():
+            self.sections[name] = view[start + offset:start + offset + 4 * length].cast('i')
+        self.names = self.header['names']
+        self.rules = self.header['rules']
+        self.nodes = [None] * len(self.sections['node_kind'])
+
+    def formula(self, number):
+        kind, a, b = self.sections['node_kind'], self.sections['node_a'], self.sections['node_b']
+        stack = [number]
+        while stack:
+            node = stack[-1]
+            if self.nodes[node] is not None:
+                stack.pop()
+                continue
+            if kind[node] == VAR:
+                self.nodes[node] = Variable(self.names[a[node]])
+                stack.pop()
+                continue
+            parts = (a[node],) if kind[node] == NEG else (a[node], b[node])
+            pending = [part for part in parts if self.nodes[part] is None]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            if kind[node] == NEG:
+                self.nodes[node] = Negation(self.nodes[a[node]])
+            elif kind[node] == IMP:
+                self.nodes[node] = Implication(self.nodes[a[node]], self.nodes[b[node]])
+            else:
+                self.nodes[node] = Disjunction(self.nodes[a[node]], self.nodes[b[node]])
+        return self.nodes[number]
+
+
+class MappedDerivations:
+    # Граф вывода, чьё начало лежит в снимке, а новые записи - в памяти
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.mapped = len(snapshot.sections['deriv_formula'])
+        self.tail = []
+
+    def __len__(self):
+        return self.mapped + len(self.tail)
+
+    def __getitem__(self, k):
+        if k >= self.mapped:
+            return self.tail[k - self.mapped]
+        sections = self.snapshot.sections
+        parents = tuple(p for p in (sections['deriv_first'][k], sections['deriv_second'][k]) if p >= 0)
+        return (self.snapshot.formula(sections['deriv_formula'][k]),
+                self.snapshot.rules[sections['deriv_rule'][k]], parents)
+
+    def append(self, record):
+        self.tail.append(record)
+
+
+def restore(proofer, path):
+    """
+    Заменяет состояние proofer состоянием из снимка: хранилище, индексы,
+    пассивную очередь, открытые подцели, граф вывода и счётчики.
+    """
+    snapshot = Snapshot(path)
+    if snapshot.header['axioms'] != proofer.library_key:
+        raise ValueError(f"{path}: снимок сделан для другого набора аксиом")
+    sections = snapshot.sections
+    for name, value in snapshot.header['counters'].items():
+        setattr(proofer, name, value)
+    proofer.identities = type(proofer.identities)()
+    proofer.active = type(proofer.active)()
+    proofer.index = type(proofer.index)()
+    proofer.active_index = type(proofer.active_index)()
+    proofer.antecedents = type(proofer.antecedents)()
+    proofer.consequents = type(proofer.consequents)()
+    proofer.derivations = MappedDerivations(snapshot)
+    # Номера записей нужны для тождеств, которые могут стать посылками, и для больших посылок
+    # и родителей подцелей: meet() ссылается на них, даже если поглощение убрало их из хранилища
+    needed = set(sections['identities'])
+    needed.update(number for number in sections['subgoal_major'] if number >= 0)
+    needed.update(number for number in sections['subgoal_parent'] if number >= 0)
+    positions = {number: k for k, number in enumerate(sections['deriv_formula']) if number in needed}
+    proofer.node_of = {}
+    for number in sections['identities']:
+        expr = snapshot.formula(number)
+        proofer.identities.add(expr)
+        proofer.index.insert(expr)
+        proofer.node_of[expr] = positions[number]
+    for number in sections['active']:
+        proofer.activate(snapshot.formula(number))
+    proofer.subgoals = {}
+    proofer.goal_index = type(proofer.goal_index)()
+    for goal, parent, major in zip(sections['subgoal_goal'], sections['subgoal_parent'], sections['subgoal_major']):
+        goal = snapshot.formula(goal)
+        if goal not in proofer.subgoals:
+            proofer.subgoals[goal] = []
+            proofer.goal_index.insert(goal)
+        links = []
+        for number in (parent, major):
+            if number < 0:
+                links.append(None)
+                continue
+            expr = snapshot.formula(number)
+            if number in positions:
+                proofer.node_of.setdefault(expr, positions[number])
+            links.append(expr)
+        proofer.subgoals[goal].append(tuple(links))
+    proofer.passive = {}
+    proofer.passive_by_weight = []
+    for number, age, weight in zip(sections['passive_formula'], sections['passive_age'], sections['passive_weight']):
+        expr = snapshot.formula(number)
+        proofer.passive[expr] = age
+        proofer.passive_by_weight.append((weight, age, expr))
+    proofer.passive_by_age = [(age, expr) for expr, age in proofer.passive.items()]
+    heapq.heapify(proofer.passive_by_weight)
+    heapq.heapify(proofer.passive_by_age)
+    return proofer
@@ -0,0 +1,98 @@
+import re
+
+from formulas import Variable, Negation, Implication, Disjunction
+
+# Разбор формул в записи, которую печатает __repr__: (A → B), ¬A, (A ∨ B).
+# Допускаются ASCII-замены: '->' для →, '~' и '!' для ¬, '|' и '\/' для ∨.
+# Приоритеты: ¬ сильнее ∨ (левоассоциативна), ∨ сильнее → (правоассоциативна),
+# так что внешние скобки можно опускать, а напечатанная формула разбирается обратно в тот же узел.
+# Разбор идёт за один проход без рекурсии, поэтому годится для очень длинных и глубоких формул.
+
+
+class ParseError(ValueError):
+    pass
+
+
+# Токен или одиночный недопустимый символ (второй группой); пробелы пропускаются
+_TOKEN = re.compile(r"\s*(?:(->|\\/|[→¬~!∨|()]|[^\W\d][\w']*)|(\S))")
+
+_KINDS = {'→': 'imp', '->': 'imp', '¬': 'neg', '~': 'neg', '!': 'neg',
+          '∨': 'dis', '|': 'dis', '\\/': 'dis', '(': 'open', ')': 'close'}
+
+# Приоритет и правая ассоциативность бинарных связок
+_BINARY = {'imp': (1, True), 'dis': (2, False)}
+
+
+def _reduce(operator, operands):
+    right = operands.pop()
+    left = operands.pop()
+    operands.append(Implication(left, right) if operator == 'imp' else Disjunction(left, right))
+
+
+def _negate_pending(operators, operands):
+    # Отрицания, стоящие перед только что законченным операндом
+    while operators and operators[-1] == 'neg':
+        operators.pop()
+        operands[-1] = Negation(operands[-1])
+
+
+def parse(text):
+    operators = []
+    operands = []
+    expect_operand = True
+    kinds = _KINDS
+    for number, (token, bad) in enumerate(_TOKEN.findall(text), 1):
+        if bad:
+            raise ParseError(f"неожиданный символ {bad!r} (лексема {number})")
+        kind = kinds.get(token, 'var')
+        if expect_operand:
+            if kind == 'var':
+                operands.append(Variable(token))
+                expect_operand = False
+                if operators and operators[-1] == 'neg':
+                    _negate_pending(operators, operands)
+            elif kind == 'neg' or kind == 'open':
+                operators.append(kind)
+            else:
+                raise ParseError(f"ожидалась формула, а не {token!r} (лексема {number})")
+        elif kind == 'imp' or kind == 'dis':
+            precedence, right = _BINARY[kind]
+            while operators and operators[-1] in _BINARY:
+                top = _BINARY[operators[-1]][0]
+                if top > precedence or (top == precedence and not right):
+                    _reduce(operators.pop(), operands)
+                else:
+                    break
+            operators.append(kind)
+            expect_operand = True
+        elif kind == 'close':
+            while operators and operators[-1] != 'open':
+                _reduce(operators.pop(), operands)
+            if not operators:
+                raise ParseError(f"лишняя закрывающая скобка (лексема {number})")
+            operators.pop()
+            if operators and operators[-1] == 'neg':
+                _negate_pending(operators, operands)
+        else:
+            raise ParseError(f"ожидалась связка, а не {token!r} (лексема {number})")
+    if expect_operand:
+        raise ParseError("неожиданный конец формулы")
+    while operators:
+        operator = operators.pop()
+        if operator == 'open':
+            raise ParseError("не хватает закрывающей скобки")
+        _reduce(operator, operands)
+    return operands[0]
+
+
+def parse_lines(lines):
+    # Формулы по одной в строке; пустые строки и строки с '#' пропускаются.
+    # Возвращает тройки (номер строки, текст, формула или ParseError)
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text or text.startswith('#'):
+            continue
+        try:
+            yield number, text, parse(text)
+        except ParseError as error:
+            yield number, text, error
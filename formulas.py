@@ -0,0 +1,222 @@
+import weakref
+
+# Общее ядро формул для всех доказателей.
+# Каждая различная подформула существует ровно в одном экземпляре (hash-consing),
+# поэтому равенство формул - это проверка идентичности объектов, а хеш, размер
+# и глубина считаются один раз при создании узла.
+
+# Таблица интернирования: ключ - (тег, имя или id потомков), значение - узел.
+# Ссылки слабые, так что формулы, которые больше никто не использует, освобождаются.
+_table = weakref.WeakValueDictionary()
+
+
+class Formula:
+    __slots__ = ('_hash', 'size', 'depth', '__weakref__')
+
+    def __hash__(self):
+        return self._hash
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class Variable(Formula):
+    __slots__ = ('name',)
+
+    def __new__(cls, name):
+        key = ('V', name)
+        self = _table.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.name = name
+            self.size = 1
+            self.depth = 1
+            self._hash = hash(key)
+            _table[key] = self
+        return self
+
+    def __reduce__(self):
+        return Variable, (self.name,)
+
+    def __repr__(self):
+        return self.name
+
+    def substitute(self, var, expr):
+        return expr if self is var else self
+
+
+class Negation(Formula):
+    __slots__ = ('expression',)
+
+    def __new__(cls, expression):
+        key = ('N', id(expression))
+        self = _table.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.expression = expression
+            self.size = expression.size + 1
+            self.depth = expression.depth + 1
+            self._hash = hash(('N', expression._hash))
+            _table[key] = self
+        return self
+
+    def __reduce__(self):
+        return Negation, (self.expression,)
+
+    def __repr__(self):
+        return _render(self)
+
+    def substitute(self, var, expr):
+        return _substitute(self, var, expr)
+
+
+class Implication(Formula):
+    __slots__ = ('antecedent', 'consequent')
+
+    def __new__(cls, antecedent, consequent):
+        key = ('I', id(antecedent), id(consequent))
+        self = _table.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.antecedent = antecedent
+            self.consequent = consequent
+            self.size = antecedent.size + consequent.size + 1
+            self.depth = max(antecedent.depth, consequent.depth) + 1
+            self._hash = hash(('I', antecedent._hash, consequent._hash))
+            _table[key] = self
+        return self
+
+    def __reduce__(self):
+        return Implication, (self.antecedent, self.consequent)
+
+    def __repr__(self):
+        return _render(self)
+
+    def substitute(self, var, expr):
+        return _substitute(self, var, expr)
+
+
+class Disjunction(Formula):
+    __slots__ = ('left', 'right')
+
+    def __new__(cls, left, right):
+        key = ('D', id(left), id(right))
+        self = _table.get(key)
+        if self is None:
+            self = object.__new__(cls)
+            self.left = left
+            self.right = right
+            self.size = left.size + right.size + 1
+            self.depth = max(left.depth, right.depth) + 1
+            self._hash = hash(('D', left._hash, right._hash))
+            _table[key] = self
+        return self
+
+    def __reduce__(self):
+        return Disjunction, (self.left, self.right)
+
+    def __repr__(self):
+        return _render(self)
+
+    def substitute(self, var, expr):
+        return _substitute(self, var, expr)
+
+
+# Печать и подстановка обходят формулу по явному стеку, а не рекурсией,
+# чтобы работать с формулами любой глубины
+
+
+def _render(expr):
+    # (A → B), ¬A, (A ∨ B)
+    parts = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            parts.append(node)
+        elif isinstance(node, Variable):
+            parts.append(node.name)
+        elif isinstance(node, Negation):
+            parts.append('¬')
+            stack.append(node.expression)
+        elif isinstance(node, Implication):
+            parts.append('(')
+            stack.extend((')', node.consequent, ' → ', node.antecedent))
+        else:
+            parts.append('(')
+            stack.extend((')', node.right, ' ∨ ', node.left))
+    return ''.join(parts)
+
+
+def _substitute(expr, var, replacement):
+    # Заменяет все вхождения переменной var; неизменённые поддеревья не пересоздаются
+    done = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in done:
+            stack.pop()
+            continue
+        if isinstance(node, Variable):
+            done[node] = replacement if node is var else node
+            stack.pop()
+            continue
+        if isinstance(node, Negation):
+            parts = (node.expression,)
+        elif isinstance(node, Implication):
+            parts = (node.antecedent, node.consequent)
+        else:
+            parts = (node.left, node.right)
+        pending = [part for part in parts if part not in done]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        new = [done[part] for part in parts]
+        if all(n is o for n, o in zip(new, parts)):
+            done[node] = node
+        else:
+            done[node] = type(node)(*new)
+    return done[expr]
+
+
+# Компактная префиксная запись для передачи формул между процессами:
+# '>' - импликация, '~' - отрицание, '|' - дизъюнкция, остальное - имена переменных.
+
+
+def encode(expr):
+    tokens = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Variable):
+            tokens.append(node.name)
+        elif isinstance(node, Negation):
+            tokens.append('~')
+            stack.append(node.expression)
+        elif isinstance(node, Implication):
+            tokens.append('>')
+            stack.append(node.consequent)
+            stack.append(node.antecedent)
+        else:
+            tokens.append('|')
+            stack.append(node.right)
+            stack.append(node.left)
+    return ' '.join(tokens)
+
+
+def decode(code):
+    stack = []
+    for token in reversed(code.split(' ')):
+        if token == '>':
+            stack.append(Implication(stack.pop(), stack.pop()))
+        elif token == '~':
+            stack.append(Negation(stack.pop()))
+        elif token == '|':
+            stack.append(Disjunction(stack.pop(), stack.pop()))
+        else:
+            stack.append(Variable(token))
+    return stack.pop()
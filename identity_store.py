@@ -0,0 +1,57 @@
+class IdentityStore:
+    # Хранилище тождеств: сохраняет порядок добавления (для печати)
+    # и проверяет принадлежность за O(1) по структурному хешу формулы.
+    # Формулы делятся на поколения: каждая помнит номер поколения, в котором
+    # добавлена, а advance() закрывает текущее поколение, чтобы раунд вывода
+    # разбирал только пары с новыми формулами.
+
+    def __init__(self, identities=()):
+        self._items = {}
+        self.generation = 0
+        self.update(identities)
+
+    def add(self, expr):
+        # Возвращает True, если формула новая
+        if expr in self._items:
+            return False
+        self._items[expr] = self.generation
+        return True
+
+    def update(self, identities):
+        for expr in identities:
+            self.add(expr)
+
+    def discard(self, expr):
+        self._items.pop(expr, None)
+
+    def generation_of(self, expr):
+        return self._items[expr]
+
+    def newest(self):
+        # Формулы текущего (ещё не закрытого) поколения. Номера поколений
+        # не убывают в порядке добавления, так что это хвост словаря
+        delta = []
+        for expr in reversed(self._items):
+            if self._items[expr] != self.generation:
+                break
+            delta.append(expr)
+        delta.reverse()
+        return delta
+
+    def advance(self):
+        # Закрывает текущее поколение и возвращает его формулы
+        delta = self.newest()
+        self.generation += 1
+        return delta
+
+    def __contains__(self, expr):
+        return expr in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return f"IdentityStore({list(self._items)})"
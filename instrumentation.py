@@ -0,0 +1,63 @@
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Замеры внутри доказателя: счётчики правил, время по фазам шага и размер хранилища.
+# Доказатель обращается к трассировщику только при self.trace is not None,
+# так что без него замеры ничего не стоят.
+
+
+class Tracer:
+    def __init__(self, every=100, stream=None, json_path=None):
+        # every - через сколько шагов выводить строку прогресса или запись трассы;
+        # json_path - писать трассу в файл (по записи JSON в строке) вместо текста в stream
+        self.every = every
+        self.stream = stream if stream is not None else sys.stderr
+        self.json_file = open(json_path, 'w', encoding='utf-8') if json_path else None
+        self.counters = Counter()
+        self.timers = defaultdict(float)
+        self.start = time.perf_counter()
+        self.steps = 0
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def add_time(self, phase, seconds):
+        self.timers[phase] += seconds
+
+    def snapshot(self, proofer):
+        generated = self.counters['mp_success']
+        return {
+            'step': self.steps,
+            'elapsed': time.perf_counter() - self.start,
+            'identities': len(proofer.identities),
+            'active': len(proofer.active),
+            'passive': len(proofer.passive),
+            'duplicate_rate': self.counters['duplicate'] / generated if generated else 0.0,
+            'counters': dict(self.counters),
+            'timers': dict(self.timers),
+        }
+
+    def end_step(self, proofer):
+        self.steps += 1
+        if self.steps % self.every == 0:
+            self.emit(proofer)
+
+    def emit(self, proofer):
+        record = self.snapshot(proofer)
+        if self.json_file is not None:
+            self.json_file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self.json_file.flush()
+            return
+        phases = ' '.join(f"{phase}={seconds:.2f}s" for phase, seconds in sorted(record['timers'].items()))
+        print(f"[шаг {record['step']}] {record['elapsed']:.1f}s тождеств={record['identities']} "
+              f"активных={record['active']} пассивных={record['passive']} "
+              f"MP={self.counters['mp_success']}/{self.counters['mp_attempt']} "
+              f"дубликатов={record['duplicate_rate']:.0%} {phases}", file=self.stream)
+
+    def close(self, proofer):
+        self.emit(proofer)
+        if self.json_file is not None:
+            self.json_file.close()
+            self.json_file = None
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import sqlite3
+
+from formulas import encode, decode
+from term_index import DiscriminationTree
+from unification import canonical, match
+
+# Постоянная библиотека доказанных лемм, общая для запусков доказателя.
+# Леммы хранятся в SQLite по ключу набора аксиом вместе с выводом: списком
+# шагов (формула, правило, номера посылок среди предыдущих шагов), последний
+# шаг - сама лемма. Для поиска частных случаев леммы набора аксиом
+# загружаются в дерево различения при первом обращении.
+
+
+def axioms_key(axioms):
+    codes = sorted(encode(canonical(axiom)) for axiom in axioms)
+    return hashlib.sha1('\n'.join(codes).encode('utf-8')).hexdigest()
+
+
+class LemmaLibrary:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS lemmas ('
+            ' axioms TEXT NOT NULL, formula TEXT NOT NULL, size INTEGER NOT NULL, steps TEXT NOT NULL,'
+            ' PRIMARY KEY (axioms, formula))')
+        self.connection.commit()
+        # Ключ набора аксиом -> (дерево различения, формула -> шаги в записи JSON)
+        self.loaded = {}
+
+    def _load(self, key):
+        if key not in self.loaded:
+            index = DiscriminationTree()
+            steps = {}
+            rows = self.connection.execute(
+                'SELECT formula, steps FROM lemmas WHERE axioms = ? ORDER BY size, rowid', (key,))
+            for code, raw_steps in rows:
+                expr = decode(code)
+                index.insert(expr)
+                steps[expr] = raw_steps
+            self.loaded[key] = index, steps
+        return self.loaded[key]
+
+    def lemmas(self, key):
+        # Все леммы набора аксиом (от коротких к длинным) с их выводами
+        _, steps = self._load(key)
+        return [(expr, self.decode_steps(raw_steps)) for expr, raw_steps in steps.items()]
+
+    def lookup(self, key, expr):
+        # Лемма, частным случаем которой является expr, и её вывод; None, если такой нет
+        index, steps = self._load(key)
+        for lemma in index.generalizations(expr):
+            if match(lemma, expr) is not None:
+                return lemma, self.decode_steps(steps[lemma])
+        return None
+
+    def add(self, key, expr, steps):
+        index, known = self._load(key)
+        if expr in known:
+            return
+        raw_steps = json.dumps([[encode(formula), rule, list(parents)] for formula, rule, parents in steps])
+        self.connection.execute('INSERT OR IGNORE INTO lemmas VALUES (?, ?, ?, ?)',
+                                (key, encode(expr), expr.size, raw_steps))
+        self.connection.commit()
+        index.insert(expr)
+        known[expr] = raw_steps
+
+    def __len__(self):
+        return self.connection.execute('SELECT COUNT(*) FROM lemmas').fetchone()[0]
+
+    @staticmethod
+    def decode_steps(raw_steps):
+        return [(decode(code), rule, tuple(parents)) for code, rule, parents in json.loads(raw_steps)]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,270 @@
+from formulas import Variable, Negation, Implication, Disjunction
+from unification import match
+
+# Доказательство тавтологий с → и ¬ по теореме о дедукции.
+# Поиск идёт в стиле естественного вывода: посылка цели P → Q становится гипотезой,
+# цель выводится из гипотез цепочкой MP или от противного (аксиома A3).
+# Найденное дерево вывода затем механически переводится в обычный вывод
+# из A1-A3 и MP: каждая снятая гипотеза H убирается преобразованием из
+# доказательства теоремы о дедукции, шаги которого - частные случаи аксиом.
+#
+# Дерево вывода - кортежи (вид, формула, ...):
+#   ('H', F) - гипотеза, ('AX', F, имя аксиомы), ('MP', F, большая посылка, малая посылка),
+#   ('DT', H → F, H, вывод F с гипотезой H).
+# Вывод - список (формула, правило, номера посылок), как Auto_proof.derivation_steps,
+# но все формулы конкретные, а MP применяется без унификации.
+
+_A = Variable("A")
+_B = Variable("B")
+_C = Variable("C")
+
+AXIOMS = [
+    Implication(_A, Implication(_B, _A)),
+    Implication(Implication(_A, Implication(_B, _C)), Implication(Implication(_A, _B), Implication(_A, _C))),
+    Implication(Implication(Negation(_B), Negation(_A)), Implication(Implication(Negation(_B), _A), _B)),
+]
+
+
+def axiom1(p, q):
+    return Implication(p, Implication(q, p))
+
+
+def axiom2(p, q, r):
+    return Implication(Implication(p, Implication(q, r)), Implication(Implication(p, q), Implication(p, r)))
+
+
+def axiom3(p, q):
+    return Implication(Implication(Negation(q), Negation(p)), Implication(Implication(Negation(q), p), q))
+
+
+def _mp(major, minor):
+    return ('MP', major[1].consequent, major, minor)
+
+
+def _reductio(goal, f, not_f, yes_f):
+    # Из выводов ¬F и F с гипотезой ¬goal - вывод goal по A3
+    negation = Negation(goal)
+    a3 = ('AX', axiom3(f, goal), 'A3')
+    return _mp(_mp(a3, ('DT', Implication(negation, Negation(f)), negation, not_f)),
+               ('DT', Implication(negation, f), negation, yes_f))
+
+
+def _assume(available, hyp):
+    # Доступные формулы после добавления гипотезы: сама гипотеза
+    # и всё, что получается из неё снятием двойных отрицаний
+    available = dict(available)
+    pending = [(hyp, ('H', hyp))]
+    while pending:
+        formula, tree = pending.pop()
+        if formula in available:
+            continue
+        available[formula] = tree
+        if isinstance(formula, Negation) and isinstance(formula.expression, Negation):
+            x = formula.expression.expression
+            pending.append((x, _reductio(x, Negation(x), tree, ('H', Negation(x)))))
+    return available
+
+
+def _premises(formula, goal):
+    # Посылки P1, ..., Pn, если formula = P1 → (... → (Pn → goal)); иначе None
+    premises = []
+    while formula is not goal:
+        if not isinstance(formula, Implication):
+            return None
+        premises.append(formula.antecedent)
+        formula = formula.consequent
+    return premises
+
+
+def _contradictions(available):
+    # Формулы F, для которых ¬F доступна сама или как заключение цепочки импликаций
+    seen = {}
+    for formula in available:
+        while isinstance(formula, Implication):
+            formula = formula.consequent
+        if isinstance(formula, Negation):
+            seen.setdefault(formula.expression, None)
+    return list(seen)
+
+
+def _search(available, goal, depth, failed):
+    tree = available.get(goal)
+    if tree is not None:
+        return tree
+    if isinstance(goal, Implication):
+        # Введение импликации обратимо, поэтому других правил для неё не нужно
+        body = _search(_assume(available, goal.antecedent), goal.consequent, depth, failed)
+        return None if body is None else ('DT', goal, goal.antecedent, body)
+    if depth == 0:
+        return None
+    key = (frozenset(available), goal)
+    if failed.get(key, -1) >= depth:
+        return None
+    # Цепочка MP из доступной формулы, заключение которой - цель
+    for formula, tree in list(available.items()):
+        premises = _premises(formula, goal)
+        if premises is None:
+            continue
+        proofs = []
+        for premise in premises:
+            proof = _search(available, premise, depth - 1, failed)
+            if proof is None:
+                break
+            proofs.append(proof)
+        else:
+            for proof in proofs:
+                tree = _mp(tree, proof)
+            return tree
+    # От противного: с гипотезой ¬goal выводятся F и ¬F
+    # (если ¬goal уже доступна, это вывод из противоречивых гипотез)
+    inner = _assume(available, Negation(goal))
+    for f in _contradictions(inner):
+        not_f = _search(inner, Negation(f), depth - 1, failed)
+        if not_f is None:
+            continue
+        yes_f = _search(inner, f, depth - 1, failed)
+        if yes_f is not None:
+            return _reductio(goal, f, not_f, yes_f)
+    failed[key] = depth
+    return None
+
+
+class _Lines:
+    # Вывод без повторов: формула -> номер строки
+    def __init__(self):
+        self.steps = []
+        self.numbers = {}
+
+    def add(self, formula, rule, parents):
+        k = self.numbers.get(formula)
+        if k is None:
+            k = len(self.steps)
+            self.numbers[formula] = k
+            self.steps.append((formula, rule, parents))
+        return k
+
+
+def _identity(hyp, out):
+    # H → H из A1, A2 и MP
+    hh = Implication(hyp, hyp)
+    a2 = out.add(axiom2(hyp, hh, hyp), 'A2', ())
+    a1 = out.add(axiom1(hyp, hh), 'A1', ())
+    step = out.add(Implication(Implication(hyp, hh), hh), 'MP', (a2, a1))
+    return out.add(hh, 'MP', (step, out.add(axiom1(hyp, hyp), 'A1', ())))
+
+
+def _discharge(hyp, steps, last):
+    """
+    Теорема о дедукции: из вывода с гипотезой hyp строит вывод hyp → X
+    для строки last. Строки, не зависящие от hyp, переносятся как есть.
+    """
+    out = _Lines()
+    copied = {}
+    implied = {}
+
+    def implication_of(k):
+        # Номер строки hyp → X для строки k
+        if k not in implied:
+            formula = steps[k][0]
+            a1 = out.add(axiom1(formula, hyp), 'A1', ())
+            implied[k] = out.add(Implication(hyp, formula), 'MP', (a1, copied[k]))
+        return implied[k]
+
+    for k, (formula, rule, parents) in enumerate(steps):
+        if rule == 'H' and formula is hyp:
+            implied[k] = _identity(hyp, out)
+        elif rule == 'MP' and any(parent in implied and parent not in copied for parent in parents):
+            major, minor = parents
+            middle = steps[minor][0]
+            a2 = out.add(axiom2(hyp, middle, formula), 'A2', ())
+            step = out.add(Implication(Implication(hyp, middle), Implication(hyp, formula)), 'MP',
+                           (a2, implication_of(major)))
+            implied[k] = out.add(Implication(hyp, formula), 'MP', (step, implication_of(minor)))
+        else:
+            copied[k] = out.add(formula, rule, tuple(copied[parent] for parent in parents))
+    implication_of(last)
+    return out.steps
+
+
+def _compile(tree, out):
+    kind, formula = tree[0], tree[1]
+    if kind == 'H':
+        return out.add(formula, 'H', ())
+    if kind == 'AX':
+        return out.add(formula, tree[2], ())
+    if kind == 'MP':
+        major = _compile(tree[2], out)
+        minor = _compile(tree[3], out)
+        return out.add(formula, 'MP', (major, minor))
+    body = _Lines()
+    last = _compile(tree[3], body)
+    numbers = []
+    for step_formula, rule, parents in _discharge(tree[2], body.steps, last):
+        numbers.append(out.add(step_formula, rule, tuple(numbers[parent] for parent in parents)))
+    return out.numbers[formula]
+
+
+def _prune(steps, last):
+    # Только строки, нужные для последней, с новой нумерацией
+    needed = {last}
+    for k in range(last, -1, -1):
+        if k in needed:
+            needed.update(steps[k][2])
+    numbers = {}
+    result = []
+    for k in sorted(needed):
+        formula, rule, parents = steps[k]
+        numbers[k] = len(result)
+        result.append((formula, rule, tuple(numbers[parent] for parent in parents)))
+    return result
+
+
+def _has_disjunction(expr):
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Disjunction):
+            return True
+        if isinstance(node, Negation):
+            stack.append(node.expression)
+        elif isinstance(node, Implication):
+            stack.extend((node.antecedent, node.consequent))
+    return False
+
+
+# Поиск и перевод дерева в вывод рекурсивны по строению цели,
+# поэтому более глубокие цели оставляются прямому поиску
+MAX_TARGET_DEPTH = 200
+
+
+def prove(target, max_depth=8):
+    """
+    Вывод target из A1-A3 и MP или None, если за max_depth уровней
+    поиска (цепочки MP и рассуждения от противного) он не найден.
+    Формулы с ∨ и глубже MAX_TARGET_DEPTH не поддерживаются.
+    """
+    if target.depth > MAX_TARGET_DEPTH or _has_disjunction(target):
+        return None
+    failed = {}
+    for depth in range(max_depth + 1):
+        tree = _search({}, target, depth, failed)
+        if tree is not None:
+            out = _Lines()
+            last = _compile(tree, out)
+            return _prune(out.steps, last)
+    return None
+
+
+def check(steps, axioms=AXIOMS):
+    # Проверяет вывод: аксиомы - частные случаи схем, MP - без подстановок
+    for k, (formula, rule, parents) in enumerate(steps):
+        if any(parent >= k for parent in parents):
+            return False
+        if rule == 'MP':
+            major, minor = (steps[parent][0] for parent in parents)
+            if major is not Implication(minor, formula):
+                return False
+        elif not (rule.startswith('A') and rule[1:].isdigit() and 0 < int(rule[1:]) <= len(axioms)
+                  and not parents and match(axioms[int(rule[1:]) - 1], formula) is not None):
+            return False
+    return True
@@ -0,0 +1,56 @@
+from multiprocessing import Pool
+
+from formulas import encode, decode
+from unification import canonical, condensed_detachment
+
+# Параллельное применение modus ponens к списку пар посылок.
+# Рабочие процессы получают компактный снимок: таблицу формул в префиксной
+# записи и пары номеров из этой таблицы; ответы возвращаются в порядке пар,
+# поэтому результат не зависит от числа процессов.
+
+
+def detach_chunk(chunk):
+    codes, pairs = chunk
+    table = [decode(code) for code in codes]
+    results = []
+    for i, j in pairs:
+        result = condensed_detachment(table[i], table[j])
+        results.append(None if result is None else encode(canonical(result)))
+    return results
+
+
+def make_chunk(pairs):
+    numbers = {}
+    codes = []
+    indexed = []
+    for major, minor in pairs:
+        for expr in (major, minor):
+            if expr not in numbers:
+                numbers[expr] = len(codes)
+                codes.append(encode(expr))
+        indexed.append((numbers[major], numbers[minor]))
+    return codes, indexed
+
+
+class DetachmentPool:
+    def __init__(self, workers, min_pairs=64):
+        self.workers = workers
+        # Меньшие списки пар выгоднее обработать в родительском процессе
+        self.min_pairs = min_pairs
+        self.pool = Pool(workers)
+
+    def detach(self, pairs):
+        # Канонические результаты condensed_detachment в том же порядке, что и pairs
+        if len(pairs) < self.min_pairs:
+            results = [condensed_detachment(major, minor) for major, minor in pairs]
+            return [None if result is None else canonical(result) for result in results]
+        size = -(-len(pairs) // self.workers)
+        chunks = [make_chunk(pairs[k:k + size]) for k in range(0, len(pairs), size)]
+        results = []
+        for chunk_results in self.pool.map(detach_chunk, chunks):
+            results.extend(None if code is None else decode(code) for code in chunk_results)
+        return results
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import sys
+import time
+
+from formula_parser import ParseError, parse_lines
+from lemma_library import LemmaLibrary
+from task1 import Auto_proof
+
+# Пакетный вывод: одна общая процедура насыщения для всех целей из файла.
+# Результат по каждой цели печатается строкой JSON, как только он известен:
+#
+#   python prove.py targets.txt --axioms axioms.txt --time-limit 60 > results.jsonl
+#
+# С --checkpoint состояние периодически сохраняется, а с --resume поиск продолжается
+# с последнего снимка. Код возврата 0, только если все цели разобраны и доказаны.
+#
+# В файлах по одной формуле в строке; пустые строки и строки с '#' пропускаются.
+
+
+def read_formulas(path):
+    # (номер строки, текст, формула или ParseError)
+    file = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    with file:
+        yield from parse_lines(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Автоматический вывод набора целей из аксиом с modus ponens')
+    parser.add_argument('targets', help="файл с целями, по одной в строке ('-' - стандартный ввод)")
+    parser.add_argument('--axioms', help='файл с аксиомами (по умолчанию A1-A3)')
+    parser.add_argument('--time-limit', type=float, help='секунды на весь поиск')
+    parser.add_argument('--max-identities', type=int, help='предел размера хранилища тождеств')
+    parser.add_argument('--max-memory-mb', type=float, help='предел пиковой памяти процесса')
+    parser.add_argument('--max-formula-size', type=int, help='более крупные следствия не сохраняются')
+    parser.add_argument('--max-formula-depth', type=int, help='более глубокие следствия не сохраняются')
+    parser.add_argument('--workers', type=int, default=1, help='число процессов для modus ponens')
+    parser.add_argument('--deduction', action='store_true', help='сначала выводить цели по теореме о дедукции')
+    parser.add_argument('--goal-directed', action='store_true', help='сводить цели назад к подцелям')
+    parser.add_argument('--library', help='файл библиотеки лемм (SQLite)')
+    parser.add_argument('--checkpoint', help='файл для периодических снимков состояния')
+    parser.add_argument('--resume', action='store_true', help='продолжить поиск со снимка из --checkpoint')
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint:
+        parser.error('--resume требует --checkpoint')
+    started = time.perf_counter()
+
+    def emit(record):
+        record['elapsed'] = round(time.perf_counter() - started, 6)
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    axioms = None
+    if args.axioms:
+        axioms = []
+        for number, text, expr in read_formulas(args.axioms):
+            if isinstance(expr, ParseError):
+                sys.exit(f"{args.axioms}:{number}: {expr}")
+            axioms.append(expr)
+
+    # Одинаковые цели из разных строк доказываются один раз
+    lines = {}
+    parse_errors = 0
+    for number, text, expr in read_formulas(args.targets):
+        if isinstance(expr, ParseError):
+            parse_errors += 1
+            emit({'line': number, 'target': text, 'status': 'parse-error', 'error': str(expr)})
+        else:
+            lines.setdefault(expr, []).append((number, text))
+
+    library = LemmaLibrary(args.library) if args.library else None
+    options = dict(workers=args.workers, library=library, axioms=axioms,
+                   goal_directed=args.goal_directed, deduction=args.deduction)
+    if args.resume:
+        proofer = Auto_proof.resume(args.checkpoint, **options)
+    else:
+        proofer = Auto_proof(**options)
+
+    def on_proved(expr):
+        proof = proofer.proof_lines(expr)
+        for number, text in lines[expr]:
+            emit({'line': number, 'target': text, 'status': 'proved', 'proof': proof})
+
+    def on_rejected(expr):
+        for number, text in lines[expr]:
+            emit({'line': number, 'target': text, 'status': 'not-tautology'})
+
+    try:
+        result = proofer.proof(list(lines), time_limit=args.time_limit, max_identities=args.max_identities,
+                               max_memory_mb=args.max_memory_mb, max_formula_size=args.max_formula_size,
+                               max_formula_depth=args.max_formula_depth, checkpoint_path=args.checkpoint,
+                               on_proved=on_proved, on_rejected=on_rejected)
+    finally:
+        proofer.close()
+        if library is not None:
+            library.close()
+    # Оставшиеся цели не доказаны по той причине, по которой остановился поиск
+    for expr in result.unproved:
+        for number, text in lines[expr]:
+            emit({'line': number, 'target': text, 'status': result.status})
+    sys.exit(0 if result and not parse_errors else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+import heapq
+
+# Решатель SAT с обучением на конфликтах (CDCL).
+# Переменные - целые числа с 1, литерал - номер переменной со знаком.
+# Дизъюнкт наблюдается по двум первым литералам; при конфликте выводится
+# дизъюнкт по первой точке сочленения (1UIP). Порядок решений - VSIDS
+# с сохранением фаз, перезапуски - по последовательности Луби.
+# Предположения (assumptions) решаются первыми; если они несовместны,
+# solve() возвращает False, а core - их подмножество, приводящее к противоречию.
+
+
+def luby(k):
+    # k-й член последовательности Луби (с 0): 1, 1, 2, 1, 1, 2, 4, ...
+    size = 1
+    while size < k + 1:
+        size = 2 * size + 1
+    while size - 1 != k:
+        size //= 2
+        k %= size
+    return (size + 1) // 2
+
+
+class Solver:
+    def __init__(self, restart_base=100, decay=0.95):
+        self.clauses = []
+        self.learnts = []
+        self.watches = {}
+        # По переменной: значение (1, -1, 0 - не задано), уровень, причина, активность, сохранённая фаза
+        self.assigns = [0]
+        self.level = [0]
+        self.reason = [None]
+        self.activity = [0.0]
+        self.phase = [-1]
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.order = []
+        self.var_inc = 1.0
+        self.decay = decay
+        self.restart_base = restart_base
+        self.ok = True
+        self.model = None
+        self.core = None
+        self.conflicts = 0
+        self.decisions = 0
+        self.propagations = 0
+
+    def new_var(self):
+        self.assigns.append(0)
+        self.level.append(0)
+        self.reason.append(None)
+        self.activity.append(0.0)
+        self.phase.append(-1)
+        var = len(self.assigns) - 1
+        self.watches[var] = []
+        self.watches[-var] = []
+        heapq.heappush(self.order, (0.0, var))
+        return var
+
+    def reserve(self, count):
+        # Переменные 1..count существуют (в модели будут и те, что не встречаются в дизъюнктах)
+        while len(self.assigns) <= count:
+            self.new_var()
+
+    def value(self, literal):
+        # 1 - истинен, -1 - ложен, 0 - не задан
+        return self.assigns[literal] if literal > 0 else -self.assigns[-literal]
+
+    def add_clause(self, literals):
+        """
+        Добавляет дизъюнкт до решения или между вызовами solve().
+        Возвращает False, если множество дизъюнктов стало противоречивым.
+        """
+        if not self.ok:
+            return False
+        clause = []
+        for literal in literals:
+            self.reserve(abs(literal))
+            value = self.value(literal)
+            if value == 1 or -literal in clause:
+                return True
+            if value == 0 and literal not in clause:
+                clause.append(literal)
+        if not clause:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.attach(clause)
+            self.clauses.append(clause)
+        return self.ok
+
+    def attach(self, clause):
+        self.watches[clause[0]].append(clause)
+        self.watches[clause[1]].append(clause)
+
+    def enqueue(self, literal, reason):
+        var = abs(literal)
+        self.assigns[var] = 1 if literal > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(literal)
+
+    def propagate(self):
+        # Распространение единичных дизъюнктов; возвращает конфликтный дизъюнкт или None
+        assigns = self.assigns
+        watches = self.watches
+        trail = self.trail
+        while self.qhead < len(trail):
+            false_literal = -trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watching = watches[false_literal]
+            kept = []
+            for n, clause in enumerate(watching):
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], false_literal
+                first = clause[0]
+                if (assigns[first] if first > 0 else -assigns[-first]) == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    literal = clause[k]
+                    if (assigns[literal] if literal > 0 else -assigns[-literal]) != -1:
+                        clause[1], clause[k] = literal, false_literal
+                        watches[literal].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if (assigns[first] if first > 0 else -assigns[-first]) == -1:
+                        kept.extend(watching[n + 1:])
+                        watches[false_literal] = kept
+                        self.qhead = len(trail)
+                        return clause
+                    self.enqueue(first, clause)
+            watches[false_literal] = kept
+        return None
+
+    def analyze(self, conflict):
+        # Выученный дизъюнкт (первый литерал - утверждаемый) и уровень возврата
+        seen = set()
+        learnt = [0]
+        counter = 0
+        literal = None
+        clause = conflict
+        index = len(self.trail) - 1
+        current = len(self.trail_lim)
+        while True:
+            for other in (clause if literal is None else clause[1:]):
+                var = abs(other)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(other)
+            while abs(self.trail[index]) not in seen:
+                index -= 1
+            literal = self.trail[index]
+            index -= 1
+            clause = self.reason[abs(literal)]
+            seen.discard(abs(literal))
+            counter -= 1
+            if counter == 0:
+                break
+        learnt[0] = -literal
+        if len(learnt) == 1:
+            return learnt, 0
+        # Второй наблюдаемый литерал - с наибольшим уровнем среди остальных
+        k = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[k] = learnt[k], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def analyze_final(self, literal):
+        # Предположения, из-за которых ложно предположение literal (вместе с ним самим)
+        core = [literal]
+        if not self.trail_lim:
+            return core
+        seen = {abs(literal)}
+        for other in reversed(self.trail[self.trail_lim[0]:]):
+            var = abs(other)
+            if var not in seen:
+                continue
+            reason = self.reason[var]
+            if reason is None:
+                core.append(other)
+            else:
+                seen.update(abs(q) for q in reason[1:] if self.level[abs(q)] > 0)
+        return core
+
+    def bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [activity * 1e-100 for activity in self.activity]
+            self.var_inc *= 1e-100
+            self.order = [(-self.activity[v], v) for v in range(1, len(self.assigns)) if self.assigns[v] == 0]
+            heapq.heapify(self.order)
+        elif self.assigns[var] == 0:
+            heapq.heappush(self.order, (-self.activity[var], var))
+
+    def cancel_until(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for literal in self.trail[start:]:
+            var = abs(literal)
+            self.phase[var] = self.assigns[var]
+            self.assigns[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.order, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch(self):
+        # Незаданная переменная с наибольшей активностью (устаревшие записи кучи пропускаются)
+        while self.order:
+            activity, var = heapq.heappop(self.order)
+            if self.assigns[var] == 0 and -activity == self.activity[var]:
+                return var if self.phase[var] > 0 else -var
+        return 0
+
+    def search(self, budget, assumptions):
+        # True, False или None (исчерпан бюджет конфликтов - нужен перезапуск)
+        conflicts = 0
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                conflicts += 1
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.ok = False
+                    self.core = []
+                    return False
+                learnt, level = self.analyze(conflict)
+                self.cancel_until(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.attach(learnt)
+                    self.learnts.append(learnt)
+                    self.enqueue(learnt[0], learnt)
+                self.var_inc /= self.decay
+                continue
+            if conflicts >= budget:
+                self.cancel_until(0)
+                return None
+            decision = 0
+            while len(self.trail_lim) < len(assumptions):
+                assumption = assumptions[len(self.trail_lim)]
+                value = self.value(assumption)
+                if value == 1:
+                    self.trail_lim.append(len(self.trail))
+                elif value == -1:
+                    self.core = self.analyze_final(assumption)
+                    return False
+                else:
+                    decision = assumption
+                    break
+            if not decision:
+                decision = self.pick_branch()
+                if not decision:
+                    self.model = [value > 0 for value in self.assigns]
+                    return True
+                self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(decision, None)
+
+    def solve(self, assumptions=()):
+        """
+        Выполнимы ли дизъюнкты при истинных assumptions. При успехе model[v] -
+        значение переменной v; при неудаче core - противоречивое подмножество
+        assumptions (пустое, если противоречивы сами дизъюнкты).
+        """
+        self.model = None
+        self.core = None
+        if not self.ok:
+            self.core = []
+            return False
+        assumptions = list(assumptions)
+        for literal in assumptions:
+            self.reserve(abs(literal))
+        restarts = 0
+        max_learnts = max(len(self.clauses) // 3, 1000)
+        while True:
+            result = self.search(self.restart_base * luby(restarts), assumptions)
+            restarts += 1
+            if result is not None:
+                self.cancel_until(0)
+                return result
+            if len(self.learnts) > max_learnts:
+                self.reduce_learnts()
+            max_learnts *= 1.1
+
+    def reduce_learnts(self):
+        # На уровне 0 после перезапуска: оставляет более короткую половину выученных дизъюнктов.
+        # Наблюдаемые литералы - по-прежнему первые два, поэтому списки наблюдения просто строятся заново
+        self.learnts.sort(key=len)
+        del self.learnts[len(self.learnts) // 2:]
+        self.watches = {literal: [] for literal in self.watches}
+        for clause in self.clauses:
+            self.attach(clause)
+        for clause in self.learnts:
+            self.attach(clause)
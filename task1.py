@@ -1,138 +1,588 @@
-class Variable:
-    def __init__(self, name):
-        self.name = name
+import heapq
+import sys
+import time
 
-    def __repr__(self):
-        return self.name
-
-    def __eq__(self, other):
-        return isinstance(other, Variable) and self.name == other.name
+try:
+    import resource
+except ImportError:
+    # Нет в Windows: ограничение по памяти тогда не проверяется
+    resource = None
 
-    def substitute(self, var, expr):
-        if self == var:
-            return expr
-        return self
+import checkpoint
+import natural_deduction
+from formulas import Variable, Negation, Implication
+from identity_store import IdentityStore
+from lemma_library import axioms_key
+from parallel import DetachmentPool
+from term_index import DiscriminationTree
+from truth_table import MAX_VARIABLES, is_tautology
+from unification import apply, canonical, condensed_detachment, match, rename_apart, variables
 
 
-class Negation:
+class ProofResult:
+    # Итог proof(): почему поиск остановился, какие цели доказаны, и статистика.
+    # status: 'proved' - доказаны все цели; 'refuted' - доказаны все, кроме не тавтологий;
+    # 'saturated' - выводить больше нечего; 'timeout'; 'resource-exhausted' - превышен предел,
+    # в том числе очередь опустела, но часть следствий отброшена по max_formula_size/max_formula_depth
+    def __init__(self, status, proved, unproved, rejected, stats):
+        self.status = status
+        self.proved = proved
+        self.unproved = unproved
+        self.rejected = rejected
+        self.stats = stats
 
-    def __init__(self, expression):
-        self.expression = expression
-        self.history = ''
+    def __bool__(self):
+        return self.status == 'proved'
 
     def __repr__(self):
-        return f"¬{self.expression}"
+        return f"ProofResult({self.status}, доказано {len(self.proved)}, не доказано {len(self.unproved)})"
 
-    def __eq__(self, other):
-        return isinstance(other, Negation) and self.expression == other.expression
 
-    def substitute(self, var, expr):
-        neg = Negation(self.expression.substitute(var, expr))
-        neg.history = self.history
-        return neg
+class Auto_proof:
+    def __init__(self, pick_given_ratio=4, workers=1, debug=False, trace=None, library=None, preload=True,
+                 axioms=None, goal_directed=False, max_subgoals=10000, max_reductions=50, deduction=False):
+        # axioms - список формул-схем вместо A1-A3; в выводе они называются A1, A2, ...
+        if axioms is None:
+            A = Variable("A")
+            B = Variable("B")
+            C = Variable("C")
+            axiom1 = Implication(A, Implication(B, A))
+            axiom2 = Implication(Implication(A, Implication(B, C)), Implication(Implication(A, B), Implication(A, C)))
+            axiom3 = Implication(Implication(Negation(B), Negation(A)), Implication(Implication(Negation(B), A), B))
+            axioms = [axiom1, axiom2, axiom3]
+        # Все сохранённые тождества и уже обработанные (активные) из них
+        self.identities = IdentityStore()
+        self.active = IdentityStore()
+        # Индекс всех тождеств для поиска обобщений и частных случаев (поглощение)
+        self.index = DiscriminationTree()
+        # Индексы активных тождеств: малые посылки и импликации по их посылке
+        self.active_index = DiscriminationTree()
+        self.antecedents = DiscriminationTree()
+        self.consequents = DiscriminationTree()
+        # Поиск от цели: подцель -> список (родитель, большая посылка). Вывод подцели вместе с
+        # большой посылкой даёт родителя по MP; у самих целей родитель - None.
+        # Прямой поиск закрывает подцели, а формулы, похожие на открытые подцели, выбираются раньше
+        self.goal_directed = goal_directed
+        self.subgoals = {}
+        self.goal_index = DiscriminationTree()
+        self.max_subgoals = max_subgoals
+        self.max_subgoal_size = 0
+        # Сведений подцелей за шаг не больше max_reductions, чтобы обратный поиск
+        # не отнимал время у прямого; не сделанные из-за предела сведения пропускаются
+        self.max_reductions = max_reductions
+        self.reductions_left = max_reductions
+        # Момент (time.perf_counter), после которого подцели больше не сводятся; задаёт proof()
+        self.deadline = None
+        # Пассивная очередь: формула -> возраст; две кучи с ленивым удалением.
+        # Из каждых pick_given_ratio + 1 выборов один делается по возрасту, остальные по размеру
+        self.passive = {}
+        self.passive_by_weight = []
+        self.passive_by_age = []
+        self.pick_given_ratio = pick_given_ratio
+        self.age = 0
+        self.picks = 0
+        # Счётчики для замеров: выбранные формулы, опробованные пары, полученные следствия
+        self.steps = 0
+        self.pairs_tried = 0
+        self.generated = 0
+        # При workers > 1 выводы по выбранной формуле считаются пулом процессов
+        self.pool = DetachmentPool(workers) if workers > 1 else None
+        # В режиме отладки каждое новое тождество проверяется по таблице истинности
+        self.debug = debug
+        # instrumentation.Tracer или None (замеры выключены)
+        self.trace = trace
+        # Следствия больше этих пределов отбрасываются до сохранения (None - без предела)
+        self.max_formula_size = None
+        self.max_formula_depth = None
+        self.discarded = 0
+        # Граф вывода: для каждой сохранённой формулы запись (формула, правило, номера посылок).
+        # Записи не удаляются при поглощении, так как на них могут ссылаться потомки
+        self.derivations = []
+        self.node_of = {}
+        self.axioms = []
+        for k, axiom in enumerate(axioms):
+            axiom = canonical(axiom)
+            self.axioms.append(axiom)
+            if self.add_identity(axiom):
+                self.record(axiom, f'A{k + 1}', ())
+        # Если все аксиомы - тавтологии, то и все выводимые формулы тоже,
+        # поэтому цель, не являющуюся тавтологией, можно отвергнуть сразу
+        self.sound = all(is_tautology(axiom) for axiom in self.axioms)
+        # Цели сначала пробуются natural_deduction: он выводит из A1-A3, поэтому только для них
+        self.deduction = deduction and self.axioms == [canonical(axiom) for axiom in natural_deduction.AXIOMS]
+        # lemma_library.LemmaLibrary: ранее доказанные леммы для этого набора аксиом.
+        # При preload все они сразу становятся тождествами, иначе ищутся для каждой цели
+        self.library = library
+        self.library_key = axioms_key(self.axioms)
+        if library is not None and preload:
+            for lemma, steps in library.lemmas(self.library_key):
+                self.add_lemma(lemma, steps)
 
+    def modus_ponsens(self, expr1, expr2):
+        # Конденсированное отделение: expr1 = (P → Q), expr2 унифицируется с P.
+        # Результат приводится к каноническому виду, чтобы варианты с другими именами совпадали
+        new_expressions = []
+        result = condensed_detachment(expr1, expr2)
+        if result is not None:
+            new_expressions.append(canonical(result))
+        return new_expressions
 
-class Implication:
+    def record(self, expr, rule, parents):
+        # Запоминает вывод формулы: O(1) на формулу вместо копирования истории посылок
+        if expr not in self.node_of:
+            self.node_of[expr] = len(self.derivations)
+            self.derivations.append((expr, rule, parents))
 
-    def __init__(self, antecedent, consequent):
-        self.antecedent = antecedent
-        self.consequent = consequent
-        self.history = ''
+    def is_uniq(self, expr, store):
+        return expr not in store
 
-    def __repr__(self):
-        return f"({self.antecedent} → {self.consequent})"
+    def is_subsumed(self, expr):
+        # Прямое поглощение: expr - частный случай уже известного тождества
+        return self.find_general(expr) is not None
 
-    def __eq__(self, other):
-        return (isinstance(other,
-                           Implication) and self.antecedent == other.antecedent and self.consequent == other.consequent)
+    def add_identity(self, expr):
+        # Добавляет тождество в пассивную очередь, если оно не поглощено,
+        # и убирает те старые тождества, которые оказались его частными случаями
+        if self.is_subsumed(expr):
+            return False
+        if self.debug:
+            assert is_tautology(expr), f"выведена не тавтология: {expr}"
+        for old in self.index.instances(expr):
+            if match(expr, old) is not None:
+                self.remove_identity(old)
+                if self.trace is not None:
+                    self.trace.count('backward_subsumed')
+        self.index.insert(expr)
+        self.identities.add(expr)
+        self.age += 1
+        self.passive[expr] = self.age
+        heapq.heappush(self.passive_by_weight, (self.weight(expr), self.age, expr))
+        heapq.heappush(self.passive_by_age, (self.age, expr))
+        return True
 
-    def substitute(self, var, expr):
-        new_antecedent = self.antecedent.substitute(var, expr)
-        new_consequent = self.consequent.substitute(var, expr)
-        imp = Implication(new_antecedent, new_consequent)
-        imp.history = self.history
-        return imp
+    def remove_identity(self, expr):
+        self.index.remove(expr)
+        self.identities.discard(expr)
+        self.passive.pop(expr, None)
+        if expr in self.active:
+            self.active.discard(expr)
+            self.active_index.remove(expr)
+            if isinstance(expr, Implication):
+                self.antecedents.remove(expr.antecedent, expr)
+                self.consequents.remove(expr.consequent, expr)
 
+    def select_given(self):
+        # Следующая формула из пассивной очереди или None, если очередь пуста
+        self.picks += 1
+        queues = [self.passive_by_weight, self.passive_by_age]
+        if self.picks % (self.pick_given_ratio + 1) == 0:
+            queues.reverse()
+        for queue in queues:
+            while queue:
+                item = heapq.heappop(queue)
+                age, expr = item[-2], item[-1]
+                if self.passive.get(expr) == age:
+                    del self.passive[expr]
+                    return expr
+        return None
 
-class Auto_proof:
-    def __init__(self):
-        A = Variable("A")
-        B = Variable("B")
-        C = Variable("C")
-        axiom1 = Implication(A, Implication(B, A))
-        axiom2 = Implication(Implication(A, Implication(B, C)), Implication(Implication(A, B), Implication(A, C)))
-        axiom3 = Implication(Implication(Negation(B), Negation(A)), Implication(Implication(Negation(B), A), B))
-        self.identities = [axiom1, axiom2, axiom3]
+    def activate(self, expr):
+        self.active.add(expr)
+        self.active_index.insert(expr)
+        if isinstance(expr, Implication):
+            self.antecedents.insert(expr.antecedent, expr)
+            self.consequents.insert(expr.consequent, expr)
 
-    def modus_ponsens(self, expr1, expr2):
-        new_expressions = []
-        if isinstance(expr1, Implication):
-            if expr1.antecedent.__eq__(expr2):
-                new_expressions.append(expr1.consequent)
-            if isinstance(expr1.antecedent, Variable):
-                new_expressions.append(expr1.consequent.substitute(expr1.antecedent, expr2))
-            if isinstance(expr1.antecedent, Implication):
-                for ant in self.modus_ponsens(expr1.antecedent, expr2):
-                    new_expressions.append(Implication(ant, expr1.consequent))
-        if isinstance(expr1, Negation):
-            for neg in self.modus_ponsens(expr1.expression, expr2):
-                new_expressions.append(Negation(neg))
-        for expr in new_expressions:
-            if isinstance(expr, Implication) or isinstance(expr, Negation):
-                expr.history += f'\n получено из {expr1} и {expr2}\n {expr1} получно из {expr1.history}\n и {expr2} получено из {expr2.history}'
-        return new_expressions
+    def minor_candidates(self, major):
+        # Активные тождества, которые могут унифицироваться с посылкой major
+        if not isinstance(major, Implication):
+            return []
+        return self.active_index.unifiable(major.antecedent)
 
-    def is_uniq(self, expr, arr):
-        return all((not (i.__eq__(expr))) for i in arr)
+    def major_candidates(self, minor):
+        # Активные импликации, посылка которых может унифицироваться с minor
+        return self.antecedents.unifiable(minor)
 
     def step(self):
-        new_exprssions = []
-        for i in self.identities:
-            for j in self.identities:
-                new = self.modus_ponsens(i, j)
-                for x in new:
-                    if self.is_uniq(x, self.identities) and self.is_uniq(x, new_exprssions):
-                        new_exprssions.append(x)
-        self.make_new_identities()
-        for i in new_exprssions:
-            self.identities.append(i)
-
-    def make_new_identities(self):
-        # Этот метод частично заменяет отсутствующую унификацию
-        old = self.identities.copy()
-        for identity in old:
-            A_B_C_identity = identity.substitute(Variable('C'), Variable('A'))
-            self.identities.append(A_B_C_identity)
-            A_B_identity = identity.substitute(Variable('A'), Variable('X'))
-            A_B_identity = A_B_identity.substitute(Variable('B'), Variable('A'))
-            A_B_identity = A_B_identity.substitute(Variable('X'), Variable('B'))
-            self.identities.append(A_B_identity)
-            A_A_identity = identity.substitute(Variable('B'), Variable('A'))
-            self.identities.append(A_A_identity)
-
-            B_BA_identity = identity.substitute(Variable('B'), Implication(Variable('B'), Variable('A')))
-            A_AB_identity = identity.substitute(Variable('A'), Implication(Variable('A'), Variable('B')))
-            self.identities.append((B_BA_identity))
-            self.identities.append((A_AB_identity))
+        # Одна итерация цикла given-clause: выбранная формула комбинируется
+        # только с активными, поэтому каждая пара рассматривается один раз.
+        # Возвращает список добавленных тождеств или None, если выводить больше нечего
+        trace = self.trace
+        if trace is not None:
+            started = time.perf_counter()
+        given = self.select_given()
+        if given is None:
+            return None
+        self.activate(given)
+        # Новая активная импликация сводит открытые подцели, которые обобщает её заключение.
+        # Заключение-переменная обобщает все подцели, но reduction() такие посылки отвергает
+        derived = []
+        self.reductions_left = self.max_reductions
+        if self.subgoals and isinstance(given, Implication) and not isinstance(given.consequent, Variable):
+            for goal in self.goal_index.instances(given.consequent):
+                if self.reductions_left <= 0:
+                    break
+                premise = self.reduction(goal, given) if goal in self.subgoals else None
+                if premise is not None:
+                    derived.extend(self.add_subgoal(premise, goal, given))
+        pairs = [(given, j) for j in self.minor_candidates(given)]
+        pairs.extend((i, given) for i in self.major_candidates(given) if i is not given)
+        if trace is not None:
+            selected = time.perf_counter()
+            trace.add_time('select', selected - started)
+        if self.pool is not None:
+            results = [[] if x is None else [x] for x in self.pool.detach(pairs)]
+        else:
+            results = [self.modus_ponsens(i, j) for i, j in pairs]
+        self.steps += 1
+        self.pairs_tried += len(pairs)
+        generated = sum(len(new) for new in results)
+        self.generated += generated
+        if trace is not None:
+            detached = time.perf_counter()
+            trace.add_time('modus_ponens', detached - selected)
+            trace.count('mp_attempt', len(pairs))
+            trace.count('mp_success', generated)
+        # Новая формула -> (большая посылка, малая посылка) первого её вывода;
+        # слияние идёт в порядке пар, поэтому не зависит от числа процессов
+        new_exprssions = {}
+        for (i, j), new in zip(pairs, results):
+            for x in new:
+                new_exprssions.setdefault(x, (i, j))
+        added = []
+        duplicates = generated - len(new_exprssions)
+        forward_subsumed = 0
+        for x, (i, j) in new_exprssions.items():
+            if self.is_too_big(x):
+                self.discarded += 1
+            elif not self.is_uniq(x, self.identities):
+                duplicates += 1
+            elif self.add_identity(x):
+                self.record(x, 'MP', (self.node_of[i], self.node_of[j]))
+                added.append(x)
+            else:
+                forward_subsumed += 1
+        if self.subgoals:
+            derived.extend(self.meet(added))
+        if trace is not None:
+            trace.add_time('merge', time.perf_counter() - detached)
+            trace.count('duplicate', duplicates)
+            trace.count('forward_subsumed', forward_subsumed)
+            trace.count('kept', len(added))
+            trace.count('subgoal_derived', len(derived))
+            trace.end_step(self)
+        return added + derived
+
+    def weight(self, expr):
+        # Ключ очереди по размеру: формулы, которые закрывают открытую подцель (обобщают её)
+        # или сводят её (заключение, не переменная, обобщает подцель), идут раньше
+        if self.subgoals and (self.generalizes_subgoal(expr) or (
+                isinstance(expr, Implication) and not isinstance(expr.consequent, Variable)
+                and self.generalizes_subgoal(expr.consequent))):
+            return expr.size // 2
+        return expr.size
+
+    def generalizes_subgoal(self, expr):
+        # Индекс отбирает кандидатов, match проверяет, что подцель - частный случай expr
+        return any(match(expr, goal) is not None for goal in self.goal_index.instances(expr))
+
+    def add_subgoal(self, goal, parent=None, major=None):
+        # Регистрирует подцель и сразу сводит её по активным импликациям.
+        # Возвращает тождества, выведенные при закрытии подцелей
+        derived = []
+        stack = [(goal, parent, major)]
+        while stack:
+            # Цепочка сведений глубокой цели может быть очень длинной, а бюджет проверяется только между шагами
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                break
+            goal, parent, major = stack.pop()
+            goal = canonical(goal)
+            if goal in self.subgoals:
+                self.subgoals[goal].append((parent, major))
+                continue
+            # Не тавтологию при корректных аксиомах закрыть нельзя
+            if parent is not None and (len(self.subgoals) >= self.max_subgoals or
+                                       goal.size > self.max_subgoal_size or
+                                       self.is_refuted(goal)):
+                continue
+            self.subgoals[goal] = [(parent, major)]
+            self.goal_index.insert(goal)
+            identity = self.find_general(goal)
+            if identity is not None:
+                derived.extend(self.meet([identity]))
+                continue
+            for major in self.consequents.generalizations(goal):
+                if self.reductions_left <= 0:
+                    break
+                premise = self.reduction(goal, major)
+                if premise is not None:
+                    stack.append((premise, goal, major))
+        return derived
+
+    def reduction(self, goal, major):
+        # Если goal - частный случай заключения major, то вывод соответствующего
+        # частного случая посылки даёт goal по MP; иначе None.
+        # Заключение-переменная подходит к любой подцели и только раздувает их число
+        if isinstance(major.consequent, Variable):
+            return None
+        self.reductions_left -= 1
+        renamed = rename_apart(major, goal)
+        subst = match(renamed.consequent, goal)
+        if subst is None:
+            return None
+        return apply(renamed.antecedent, subst)
+
+    def meet(self, identities):
+        # Тождества закрывают подцели, частными случаями которых являются; закрытая подцель
+        # с большой посылкой даёт по MP формулу, обобщающую родителя, и так до целей.
+        # Возвращает новые тождества, выведенные так
+        derived = []
+        pending = list(identities)
+        while pending:
+            identity = pending.pop()
+            for goal in self.goal_index.instances(identity):
+                if goal not in self.subgoals or match(identity, goal) is None:
+                    continue
+                links = self.subgoals.pop(goal)
+                self.goal_index.remove(goal)
+                for parent, major in links:
+                    if parent is None or parent not in self.subgoals:
+                        continue
+                    x = canonical(condensed_detachment(major, identity))
+                    if self.is_too_big(x):
+                        self.discarded += 1
+                    elif self.is_uniq(x, self.identities) and self.add_identity(x):
+                        self.record(x, 'MP', (self.node_of[major], self.node_of[identity]))
+                        derived.append(x)
+                        pending.append(x)
+                    else:
+                        pending.append(self.find_general(x))
+        return derived
+
+    def is_too_big(self, expr):
+        return ((self.max_formula_size is not None and expr.size > self.max_formula_size) or
+                (self.max_formula_depth is not None and expr.depth > self.max_formula_depth))
+
+    def find_general(self, expr):
+        # Тождество, частным случаем которого является expr (в том числе с точностью до имён)
+        key = canonical(expr)
+        if key in self.identities:
+            return key
+        for identity in self.index.generalizations(expr):
+            if match(identity, expr) is not None:
+                return identity
+        return None
+
+    def derivation_steps(self, identity):
+        # Вывод тождества из графа: список (формула, правило, номера посылок в этом списке)
+        numbers = {}
+        steps = []
+        stack = [(self.node_of[identity], False)]
+        while stack:
+            node, ready = stack.pop()
+            if node in numbers:
+                continue
+            formula, rule, parents = self.derivations[node]
+            if not ready:
+                stack.append((node, True))
+                stack.extend((parent, False) for parent in reversed(parents))
+                continue
+            numbers[node] = len(steps)
+            steps.append((formula, rule, tuple(numbers[parent] for parent in parents)))
+        return steps
+
+    def add_lemma(self, lemma, steps):
+        # Переносит вывод леммы в граф и добавляет её как тождество
+        numbers = []
+        for formula, rule, parents in steps:
+            self.record(formula, rule, tuple(numbers[parent] for parent in parents))
+            numbers.append(self.node_of[formula])
+        return self.add_identity(lemma)
+
+    def proof_lines(self, expr):
+        """
+        Восстанавливает пронумерованный вывод в стиле Гильберта для expr.
+        Каждый шаг MP применяется к подходящим частным случаям посылок (конденсированное отделение).
+        """
+        identity = self.find_general(expr)
+        if identity is None:
+            return None
+        lines = []
+        for k, (formula, rule, parents) in enumerate(self.derivation_steps(identity)):
+            if rule == 'MP':
+                reason = f"MP из {parents[0] + 1}, {parents[1] + 1}"
+            else:
+                reason = f"аксиома {rule}"
+            lines.append(f"{k + 1}. {formula}    [{reason}]")
+        if identity is not expr:
+            lines.append(f"{len(lines) + 1}. {expr}    [частный случай {len(lines)}]")
+        return lines
+
+    def print_proof(self, expr):
+        print(expr.__repr__())
+        for line in self.proof_lines(expr):
+            print(' ', line)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.trace is not None:
+            self.trace.close(self)
+
+    def print_rejected(self, expr):
+        print(expr.__repr__())
+        print('  не тавтология, вывод невозможен')
 
     def print_all_identities(self):
         for i in self.identities:
             print(repr(i))
-            print(i.history)
 
-    def proof(self, target):
+    def stats(self, started):
+        return {
+            'elapsed': time.perf_counter() - started,
+            'steps': self.steps,
+            'identities': len(self.identities),
+            'active': len(self.active),
+            'generated': self.generated,
+            'pairs_tried': self.pairs_tried,
+            'discarded': self.discarded,
+            'open_subgoals': len(self.subgoals),
+        }
+
+    def save_checkpoint(self, path):
+        checkpoint.save(self, path)
+
+    @classmethod
+    def resume(cls, path, **kwargs):
+        # Доказатель с состоянием из снимка, сделанного save_checkpoint
+        return checkpoint.restore(cls(**kwargs), path)
+
+    def proof(self, target, time_limit=None, max_identities=None, max_memory_mb=None,
+              max_formula_size=None, max_formula_depth=None, checkpoint_path=None, checkpoint_every=1000,
+              on_proved=None, on_rejected=None):
+        """
+        Ищет вывод целей, пока они не доказаны, выводить больше нечего или не исчерпан бюджет:
+        time_limit - секунды, max_identities - размер хранилища, max_memory_mb - пиковая память процесса,
+        max_formula_size / max_formula_depth - более крупные следствия не сохраняются.
+        Если задан checkpoint_path, состояние сохраняется каждые checkpoint_every шагов и при остановке.
+        Цель, не являющаяся тавтологией, невыводима из A1-A3 и отбрасывается сразу
+        (если в ней не больше truth_table.MAX_VARIABLES переменных).
+        При deduction цели сначала доказываются по теореме о дедукции (natural_deduction).
+        При goal_directed цели сводятся назад по MP к подцелям, которые закрывает прямой поиск.
+        on_proved(цель) и on_rejected(цель) вызываются сразу, как только судьба цели решена;
+        по умолчанию вывод печатается.
+        """
+        started = time.perf_counter()
+        if on_proved is None:
+            on_proved = self.print_proof
+        if on_rejected is None:
+            on_rejected = self.print_rejected
+        self.max_formula_size = max_formula_size
+        self.max_formula_depth = max_formula_depth
+        self.deadline = None if time_limit is None else started + time_limit
+        proved = []
+        # Открытые цели (словарь - как упорядоченное множество) и дерево различения по ним:
+        # новое тождество сопоставляется только с целями, которые могут быть его частными случаями
+        remaining = {}
+        open_targets = DiscriminationTree()
+        rejected = []
+        for i in target:
+            if self.is_refuted(i):
+                rejected.append(i)
+                on_rejected(i)
+            elif self.find_general(i) is not None or self.lookup_lemma(i) or self.deduce(i):
+                self.remember(i)
+                proved.append(i)
+                on_proved(i)
+            elif i not in remaining:
+                remaining[i] = None
+                open_targets.insert(i)
+        status = 'refuted' if rejected else 'proved'
+
+        def settle(added):
+            for j in added:
+                for i in open_targets.instances(j):
+                    if match(j, i) is None:
+                        continue
+                    del remaining[i]
+                    open_targets.remove(i)
+                    proved.append(i)
+                    self.remember(i)
+                    on_proved(i)
+
+        if self.goal_directed:
+            # Подцели лишь немного длиннее самой длинной цели
+            self.max_subgoal_size = max([self.max_subgoal_size] + [i.size + 4 for i in remaining])
+            for i in list(remaining):
+                self.reductions_left = self.max_reductions
+                settle(self.add_subgoal(i))
+        while remaining:
+            if time_limit is not None and time.perf_counter() - started > time_limit:
+                status = 'timeout'
+                break
+            if max_identities is not None and len(self.identities) > max_identities:
+                status = 'resource-exhausted'
+                break
+            if max_memory_mb is not None and self.steps % 100 == 0 and self.memory_mb() > max_memory_mb:
+                status = 'resource-exhausted'
+                break
+            added = self.step()
+            if added is None:
+                # Насыщение неполно, если следствия отбрасывались по размеру
+                status = 'resource-exhausted' if self.discarded else 'saturated'
+                break
+            if checkpoint_path is not None and self.steps % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_path)
+            if self.trace is not None:
+                step_done = time.perf_counter()
+            settle(added)
+            if self.trace is not None:
+                self.trace.add_time('targets', time.perf_counter() - step_done)
+        if checkpoint_path is not None:
+            self.save_checkpoint(checkpoint_path)
+        return ProofResult(status, proved, list(remaining), rejected, self.stats(started))
+
+    def is_refuted(self, expr):
+        # Не тавтология при корректных аксиомах невыводима. Широкие формулы
+        # не проверяются: таблица для них слишком велика и съела бы бюджет поиска
+        return self.sound and len(variables(expr)) <= MAX_VARIABLES and not is_tautology(expr)
+
+    def lookup_lemma(self, expr):
+        # Ищет цель в библиотеке до начала поиска; найденная лемма становится тождеством
+        if self.library is None:
+            return False
+        found = self.library.lookup(self.library_key, expr)
+        if found is None:
+            return False
+        self.add_lemma(*found)
+        return self.find_general(expr) is not None
+
+    def deduce(self, expr):
+        # Вывод по теореме о дедукции; он переносится в граф, а цель становится тождеством
+        if not self.deduction:
+            return False
+        steps = natural_deduction.prove(expr)
+        if steps is None:
+            return False
+        self.add_lemma(expr, steps)
+        return self.find_general(expr) is not None
 
-        while True:
-            # self.print_all_identities()
-            self.step()
-            for i in target:
-                for j in self.identities:
-                    if i.__eq__(j):
-                        print(j.__repr__())
-                        print(j.history)
+    def remember(self, expr):
+        # Сохраняет в библиотеку тождество, доказывающее цель, вместе с выводом
+        if self.library is not None:
+            identity = self.find_general(expr)
+            self.library.add(self.library_key, identity, self.derivation_steps(identity))
 
+    @staticmethod
+    def memory_mb():
+        # Пиковый размер процесса; 0, если узнать нельзя
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux сообщает килобайты, macOS - байты
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
 
-proofer = Auto_proof()
 
 A = Variable("A")
 B = Variable("B")
@@ -154,4 +604,6 @@ target = [
     Implication(Implication(A, B), Implication(A, (Implication(C, Implication(Implication(A, B), Implication(A, C))))))
 ]
 
-proofer.proof(target)
+if __name__ == '__main__':
+    proofer = Auto_proof()
+    proofer.proof(target)
@@ -1,3 +1,7 @@
+from formulas import Variable, Negation, Implication, Disjunction
+from identity_store import IdentityStore
+
+
 class Expression:
     def __init__(self, content):
         self.content = content
@@ -12,51 +16,50 @@ class Expression:
         return Expression(self.content.substitute(var, expr))
 
 
-class Variable:
-    def __init__(self, name):
-        self.name = name
-
-    def __repr__(self):
-        return self.name
-
-    def __eq__(self, other):
-        return isinstance(other, Variable) and self.name == other.name
-
-    def substitute(self, var, expr):
-        return expr if self == var else self
-
+def disjuncts(expr):
+    # Члены дизъюнкции P ∨ R или None; импликация ¬P → R - та же дизъюнкция
+    if isinstance(expr, Disjunction):
+        return expr.left, expr.right
+    if isinstance(expr, Implication) and isinstance(expr.antecedent, Negation):
+        return expr.antecedent.expression, expr.consequent
+    return None
 
-class Negation:
-    def __init__(self, expression):
-        self.expression = expression
 
-    def __repr__(self):
-        return f"¬{self.expression}"
+# Член дизъюнкции, который соответствует импликации P → Q в дилемме:
+# P - в конструктивных, ¬Q - в деструктивных
+_SIDES = {
+    'antecedent': lambda implication: implication.antecedent,
+    'refuted': lambda implication: Negation(implication.consequent),
+}
 
-    def __eq__(self, other):
-        return isinstance(other, Negation) and self.expression == other.expression
-
-    def substitute(self, var, expr):
-        return Negation(self.expression.substitute(var, expr))
 
+class PremiseIndex:
+    # Формулы по ключам, через которые правила ищут посылки:
+    #   'antecedent' - P для P → Q, 'consequent' - Q для P → Q, 'refuted' - ¬Q для P → Q,
+    #   'negation' - Q для ¬Q, 'disjunct' - P и R для P ∨ R (и для ¬P → R)
 
-class Implication:
-    def __init__(self, antecedent, consequent):
-        self.antecedent = antecedent
-        self.consequent = consequent
+    def __init__(self):
+        self.tables = {kind: {} for kind in ('antecedent', 'consequent', 'refuted', 'negation', 'disjunct')}
 
-    def __repr__(self):
-        return f"({self.antecedent} → {self.consequent})"
+    @staticmethod
+    def keys(expr):
+        if isinstance(expr, Implication):
+            yield 'antecedent', expr.antecedent
+            yield 'consequent', expr.consequent
+            yield 'refuted', Negation(expr.consequent)
+        if isinstance(expr, Negation):
+            yield 'negation', expr.expression
+        parts = disjuncts(expr)
+        if parts is not None:
+            yield 'disjunct', parts[0]
+            yield 'disjunct', parts[1]
 
-    def __eq__(self, other):
-        return (isinstance(other, Implication) and
-                self.antecedent == other.antecedent and
-                self.consequent == other.consequent)
+    def add(self, expr):
+        for kind, key in self.keys(expr):
+            self.tables[kind].setdefault(key, {})[expr] = None
 
-    def substitute(self, var, expr):
-        new_antecedent = self.antecedent.substitute(var, expr)
-        new_consequent = self.consequent.substitute(var, expr)
-        return Implication(new_antecedent, new_consequent)
+    def get(self, kind, key):
+        return self.tables[kind].get(key, ())
 
 
 class AutoProof:
@@ -70,170 +73,234 @@ class AutoProof:
         A2 = Implication(Implication(A, Implication(B, C)), Implication(Implication(A, B), Implication(A, C)))
         A3 = Implication(Implication(Negation(B), Negation(A)), Implication(Implication(Negation(B), A), B))
 
-        # Основные тождества
-        self.identities = [A1, A2, A3]
+        # Основные тождества (по поколениям) и индекс посылок по ним
+        self.identities = IdentityStore()
+        self.index = PremiseIndex()
         self.variables = [A, B, C]
-
-    # Правила вывода:
-    # Модус поненс
-    def modus_ponsens(self, expr1, expr2):
+        for axiom in (A1, A2, A3):
+            self.add(axiom)
+
+    def add(self, expr):
+        if self.identities.add(expr):
+            self.index.add(expr)
+
+    # Правила вывода. Каждое получает посылки в порядке схемы и возвращает список заключений
+    # (пустой, если правило к ним неприменимо). Дизъюнкция P ∨ R - это Disjunction или ¬P → R.
+
+    # Модус поненс: P → Q, P ⊢ Q
+    def modus_ponsens(self, implication, premise):
+        if isinstance(implication, Implication) and implication.antecedent is premise:
+            return [implication.consequent]
+        return []
+
+    # Модус толленс: P → Q, ¬Q ⊢ ¬P
+    def modus_tollens(self, implication, negation):
+        if (isinstance(implication, Implication) and isinstance(negation, Negation)
+                and implication.consequent is negation.expression):
+            return [Negation(implication.antecedent)]
+        return []
+
+    # Разделительный силлогизм: P ∨ Q, ¬P ⊢ Q (и P ∨ Q, ¬Q ⊢ P)
+    def disjunctive_syllogism(self, disjunction, negation):
+        parts = disjuncts(disjunction)
+        if parts is None or not isinstance(negation, Negation):
+            return []
+        left, right = parts
         new_expressions = []
-        if isinstance(expr1, Implication):
-            if isinstance(expr1.antecedent, Variable):
-                new_expressions.append(expr1.consequent.substitute(expr1.antecedent, expr2))
-            if isinstance(expr1.antecedent, Implication):
-                for ant in self.modus_ponsens(expr1.antecedent, expr2):
-                    new_expressions.append(Implication(ant, expr1.consequent))
-        if isinstance(expr1, Negation):
-            for neg in self.modus_ponsens(expr1.expression, expr2):
-                new_expressions.append(Negation(neg))
+        if left is negation.expression:
+            new_expressions.append(right)
+        if right is negation.expression:
+            new_expressions.append(left)
         return new_expressions
 
-    # Модус толленс
-    def modus_tollens(self, expr1, expr2):
-        new_expressions = []
-        if isinstance(expr1, Implication) and isinstance(expr2, Negation):
-            if expr1.consequent == expr2.expression:
-                 new_expressions.append(Negation(expr1.antecedent)) #
-        elif isinstance(expr1, Implication):
-            antecedent_results = self.modus_tollens(expr1.antecedent, expr2)#
-            consequent_results = self.modus_tollens(expr1.consequent, expr2)#
-            for ant in antecedent_results:#
-                new_expressions.append(Implication(ant, expr1.consequent))#
-            for cons in consequent_results:
-                new_expressions.append(Implication(expr1.antecedent, cons))#
-        elif isinstance(expr1, Negation):#
-            negated_results = self.modus_tollens(expr1.expression, expr2)#
-            for neg in negated_results:#
-                new_expressions.append(Negation(neg))#
-        return new_expressions#
-
-    # Разделительный силлогизм
-    def disjunctive_syllogism(self, expr1, expr2):
-        if isinstance(expr1, Negation):
-            deeper = self.disjunctive_syllogism(expr1.expression, expr2)
-            if deeper:
-                return Negation(deeper)
-
-        if isinstance(expr2, Implication):
-            new_antecedent = self.disjunctive_syllogism(expr1, expr2.antecedent)
-            new_consequent = self.disjunctive_syllogism(expr1, expr2.consequent)
-            return Implication(new_antecedent or expr2.antecedent, new_consequent or expr2.consequent)
-
-        return None
-    
-        def hypothetical_syllogism(self, expr1, expr2):
-        if isinstance(expr1, Implication):
-            new_antecedent = self.hypothetical_syllogism(expr1.antecedent, expr2)
-            new_consequent = self.hypothetical_syllogism(expr1.consequent, expr2)
-
-            return Implication(new_antecedent or expr1.antecedent, new_consequent or expr1.consequent)
-        if isinstance(expr2, Implication):
-            new_antecedent = self.hypothetical_syllogism(expr1, expr2.antecedent)
-            new_consequent = self.hypothetical_syllogism(expr1, expr2.consequent)
-
-            return Implication(new_antecedent or expr2.antecedent, new_consequent or expr2.consequent)
-        elif isinstance(expr1, Negation):
-
-            negated_expr = self.hypothetical_syllogism(expr1.expression, expr2)
-            if negated_expr:
-                return Negation(negated_expr)
-        return None
-
-    # Простая конструктивная дилемма
-    def simple_constructive_dilemma(self, expr1, expr2):
-        if isinstance(expr1, Implication) and isinstance(expr2, Implication):
-            if expr1.antecedent == expr2.antecedent:
-                return Implication(expr1.consequent, expr2.consequent)
-        elif isinstance(expr1, Negation):
-
-            negated_expr = self.simple_constructive_dilemma(expr1.expression, expr2)
-            if negated_expr:
-                return Negation(negated_expr)
-
-        return None
-
-    # Сложная конструктивная дилемма
-    def complex_constructive_dilemma(self, expr1, expr2, expr3):
-        if isinstance(expr1, Implication) and isinstance(expr2, Implication) and isinstance(expr3, Implication):
-            if expr1.antecedent == expr3.antecedent and expr2.antecedent == expr3.consequent:
-                return Implication(expr1.consequent, expr2.consequent)
-        elif isinstance(expr1, Negation):
-
-            negated_expr = self.complex_constructive_dilemma(expr1.expression, expr2, expr3)
-            if negated_expr:
-                return Negation(negated_expr)
-
-        return None
-
+    # Гипотетический силлогизм: P → Q, Q → R ⊢ P → R
+    def hypothetical_syllogism(self, first, second):
+        if (isinstance(first, Implication) and isinstance(second, Implication)
+                and first.consequent is second.antecedent):
+            return [Implication(first.antecedent, second.consequent)]
+        return []
+
+    def is_dilemma(self, impl1, impl2, disjunction, kind):
+        # disjunction - дизъюнкция сторон kind импликаций impl1 и impl2
+        if not (isinstance(impl1, Implication) and isinstance(impl2, Implication)):
+            return False
+        side = _SIDES[kind]
+        return disjuncts(disjunction) == (side(impl1), side(impl2))
+
+    # Простая конструктивная дилемма: P → Q, R → Q, P ∨ R ⊢ Q
+    def simple_constructive_dilemma(self, impl1, impl2, disjunction):
+        if self.is_dilemma(impl1, impl2, disjunction, 'antecedent') and impl1.consequent is impl2.consequent:
+            return [impl1.consequent]
+        return []
+
+    # Сложная конструктивная дилемма: P → Q, R → S, P ∨ R ⊢ Q ∨ S
+    def complex_constructive_dilemma(self, impl1, impl2, disjunction):
+        if self.is_dilemma(impl1, impl2, disjunction, 'antecedent'):
+            return [Disjunction(impl1.consequent, impl2.consequent)]
+        return []
+
+    # Простая деструктивная дилемма: P → Q, P → R, ¬Q ∨ ¬R ⊢ ¬P
     def simple_destructive_dilemma(self, impl1, impl2, disjunction):
-        new_expressions = []
-        if (isinstance(impl1, Implication) and isinstance(impl2, Implication)
-                and impl1.antecedent == impl2.antecedent
-                and isinstance(disjunction, Implication)):
-            if disjunction.consequent == Negation(impl1.consequent) or disjunction.antecedent == Negation(impl2.consequent):
-                new_expressions.append(Negation(impl1.antecedent))
-        return new_expressions
+        if self.is_dilemma(impl1, impl2, disjunction, 'refuted') and impl1.antecedent is impl2.antecedent:
+            return [Negation(impl1.antecedent)]
+        return []
 
+    # Сложная деструктивная дилемма: P → Q, R → S, ¬Q ∨ ¬S ⊢ ¬P ∨ ¬R
     def complex_destructive_dilemma(self, impl1, impl2, disjunction):
-        new_expressions = []
-        if (isinstance(impl1, Implication) and isinstance(impl2, Implication)
-                and isinstance(disjunction, Implication)):
-            if (disjunction.antecedent == Negation(impl1.consequent)
-                    and disjunction.consequent == Negation(impl2.consequent)):
-                new_expressions.append(Implication(Negation(impl1.antecedent), Negation(impl2.antecedent)))
-        return new_expressions
-
-    def is_uniq(self, expr, arr):
-        return all((not (i.__eq__(expr))) for i in arr)
-
-    def step(self):
-        new_exprssions = []
-        for i in self.identities:
-            for j in self.identities:
-                new = self.modus_tollens(i,j)
-                for x in new:
-                    if self.is_uniq(x, self.identities) and self.is_uniq(x, new_exprssions):
-                        new_exprssions.append(x)
-        self.make_new_identities()
-        for i in new_exprssions:
-            self.identities.append(i)
-
-    def make_new_identities(self):
-        old = self.identities.copy()
-        for identity in old:
+        if self.is_dilemma(impl1, impl2, disjunction, 'refuted'):
+            return [Disjunction(Negation(impl1.antecedent), Negation(impl2.antecedent))]
+        return []
+
+    # Поиск посылок. По формуле x перечисляются через индекс только те наборы посылок
+    # с x на одном из мест, в которых правило может сработать
+
+    def ponens_premises(self, x):
+        if isinstance(x, Implication) and x.antecedent in self.identities:
+            yield x, x.antecedent
+        for implication in self.index.get('antecedent', x):
+            yield implication, x
+
+    def tollens_premises(self, x):
+        if isinstance(x, Implication):
+            for negation in self.index.get('negation', x.consequent):
+                yield x, negation
+        if isinstance(x, Negation):
+            for implication in self.index.get('consequent', x.expression):
+                yield implication, x
+
+    def disjunctive_premises(self, x):
+        parts = disjuncts(x)
+        if parts is not None:
+            for part in set(parts):
+                for negation in self.index.get('negation', part):
+                    yield x, negation
+        if isinstance(x, Negation):
+            for disjunction in self.index.get('disjunct', x.expression):
+                yield disjunction, x
+
+    def hypothetical_premises(self, x):
+        if isinstance(x, Implication):
+            for second in self.index.get('antecedent', x.consequent):
+                yield x, second
+            for first in self.index.get('consequent', x.antecedent):
+                yield first, x
+
+    def dilemma_premises(self, x, kind):
+        # Тройки (impl1, impl2, дизъюнкция сторон kind обеих импликаций), содержащие x
+        index = self.index
+        parts = disjuncts(x)
+        if parts is not None:
+            left, right = parts
+            for impl1 in index.get(kind, left):
+                for impl2 in index.get(kind, right):
+                    yield impl1, impl2, x
+        if isinstance(x, Implication):
+            part = _SIDES[kind](x)
+            for disjunction in index.get('disjunct', part):
+                left, right = disjuncts(disjunction)
+                if left is part:
+                    for impl2 in index.get(kind, right):
+                        yield x, impl2, disjunction
+                if right is part:
+                    for impl1 in index.get(kind, left):
+                        yield impl1, x, disjunction
+
+    def simple_constructive_premises(self, x):
+        for impl1, impl2, disjunction in self.dilemma_premises(x, 'antecedent'):
+            if impl1.consequent is impl2.consequent:
+                yield impl1, impl2, disjunction
+
+    def complex_constructive_premises(self, x):
+        return self.dilemma_premises(x, 'antecedent')
+
+    def simple_destructive_premises(self, x):
+        for impl1, impl2, disjunction in self.dilemma_premises(x, 'refuted'):
+            if impl1.antecedent is impl2.antecedent:
+                yield impl1, impl2, disjunction
+
+    def complex_destructive_premises(self, x):
+        return self.dilemma_premises(x, 'refuted')
+
+    # Таблица правил: имя -> (правило, поиск посылок)
+    RULES = {
+        'modus_ponsens': (modus_ponsens, ponens_premises),
+        'modus_tollens': (modus_tollens, tollens_premises),
+        'disjunctive_syllogism': (disjunctive_syllogism, disjunctive_premises),
+        'hypothetical_syllogism': (hypothetical_syllogism, hypothetical_premises),
+        'simple_constructive_dilemma': (simple_constructive_dilemma, simple_constructive_premises),
+        'complex_constructive_dilemma': (complex_constructive_dilemma, complex_constructive_premises),
+        'simple_destructive_dilemma': (simple_destructive_dilemma, simple_destructive_premises),
+        'complex_destructive_dilemma': (complex_destructive_dilemma, complex_destructive_premises),
+    }
+
+    def is_uniq(self, expr, store):
+        return expr not in store
+
+    def step(self, rules):
+        # Раунд насыщения. Наборы посылок только из старых формул разобраны в прошлых раундах,
+        # поэтому перебираются лишь наборы с формулой из последнего поколения, и частные
+        # случаи строятся только для него. Возвращает False, если нового нет
+        fresh = self.identities.advance()
+        new_exprssions = IdentityStore()
+        for x in fresh:
+            for name in rules:
+                rule, premises = self.RULES[name]
+                for group in premises(self, x):
+                    for new in rule(self, *group):
+                        if self.is_uniq(new, self.identities):
+                            new_exprssions.add(new)
+        for x in new_exprssions:
+            self.add(x)
+        self.make_new_identities(fresh)
+        return bool(self.identities.newest())
+
+    def make_new_identities(self, identities):
+        for identity in identities:
             A_B_identity = identity.substitute(Variable('A'), Variable('X'))
             A_B_identity = A_B_identity.substitute(Variable('B'), Variable('A'))
             A_B_identity = A_B_identity.substitute(Variable('X'), Variable('B'))
-            self.identities.append(A_B_identity)
+            self.add(A_B_identity)
 
             A_A_identity = identity.substitute(Variable('B'), Variable('A'))
-            self.identities.append(A_A_identity)
+            self.add(A_A_identity)
 
     def print_all_identities(self):
         for i in self.identities:
             print(repr(i))
 
-    def proof(self, target):
+    def proof(self, target, rules=None, max_steps=None):
+        """
+        Насыщение правилами rules (имена из RULES, по умолчанию - все) до вывода одной из целей.
+        Возвращает выведенную цель или None, если новые формулы кончились или сделано max_steps раундов.
+        """
+        rules = list(self.RULES) if rules is None else list(rules)
+        for name in rules:
+            if name not in self.RULES:
+                raise ValueError(f"неизвестное правило {name!r}")
+        steps = 0
         while True:
-            self.step()
             for i in target:
-                for j in self.identities:
-                    if i.__eq__(j):
-                        print("proofed!:", j)
-                        return False
-
+                if i in self.identities:
+                    print("proofed!:", i)
+                    return i
+            if max_steps is not None and steps >= max_steps:
+                return None
+            if not self.step(rules):
+                print("not proofed: new identities ran out")
+                return None
+            steps += 1
 
 
-proofer = Auto_proof()
+if __name__ == '__main__':
+    proofer = AutoProof()
 
-A = Variable("A")
-B = Variable("B")
-C = Variable("C")
+    A = Variable("A")
+    B = Variable("B")
+    C = Variable("C")
 
-target = [
+    target = [
 
-    Implication(Negation(Implication(A, Negation(B))), A),
-]
+        Implication(Negation(Implication(A, Negation(B))), A),
+    ]
 
-proofer.proof(target)
+    proofer.proof(target)
@@ -1,3 +1,8 @@
+import heapq
+
+from sat import Solver
+
+
 class Expression:
     def __init__(self, content):
         self.content = content
@@ -8,9 +13,6 @@ class Expression:
     def substitute(self, var, expr):
         return Expression(self.content.substitute(var, expr))
 
-    def simplify(self):
-        return Expression(self.content.simplify())
-
 
 class Variable:
     def __init__(self, name):
@@ -30,9 +32,6 @@ class Variable:
             return expr
         return self
 
-    def simplify(self):
-        return self  # Переменная остаётся без изменений
-
 
 class Negation:
     def __init__(self, expression):
@@ -50,9 +49,6 @@ class Negation:
     def substitute(self, var, expr):
         return Negation(self.expression.substitute(var, expr))
 
-    def simplify(self):
-        return Negation(self.expression.simplify())
-
 
 class Implication:
     def __init__(self, antecedent, consequent):
@@ -73,10 +69,6 @@ class Implication:
         new_consequent = self.consequent.substitute(var, expr)
         return Implication(new_antecedent, new_consequent)
 
-    def simplify(self):
-        # A → B эквивалентно ¬A ∨ B
-        return Disjunction(Negation(self.antecedent), self.consequent)
-
 
 class Disjunction:
     def __init__(self, left, right):
@@ -97,105 +89,342 @@ class Disjunction:
         new_right = self.right.substitute(var, expr)
         return Disjunction(new_left, new_right)
 
-    def simplify(self):
-        return Disjunction(self.left.simplify(), self.right.simplify())
 
-
-def extract_literals(expression):
+class CNF:
     """
-    Извлекает все литералы (переменные и их отрицания) из выражения.
+    Перевод посылок в дизъюнкты с целыми литералами (номер переменной со знаком).
+    Посылка приводится к негативной нормальной форме: отрицания остаются только у атомов,
+    двойные отрицания снимаются, вложенные ∨ и ∧ сливаются. Посылка-конъюнкция даёт
+    по дизъюнкту на каждый член, а составная подформула внутри дизъюнкта заменяется
+    определяющей переменной d с дизъюнктами d → подформула (преобразование Цейтина в одну
+    сторону: в NNF все подформулы входят положительно). Одинаковые подформулы, в том числе
+    из разных посылок, получают одну переменную, поэтому размер результата линеен.
     """
-    if isinstance(expression, Variable) or isinstance(expression, Negation):
-        return [expression]
-    elif isinstance(expression, Disjunction):
-        return extract_literals(expression.left) + extract_literals(expression.right)
-    else:
-        return []
-
+    def __init__(self):
+        self.atoms = {}
+        self.count = 0
+        # (вид '|' или '&', отсортированные литералы членов) -> переменная, и обратно
+        self.nodes = {}
+        self.structure = {}
+        self.defined = set()
+        # Дизъюнкты определений; они выполнимы сами по себе (все d ложны)
+        self.definitions = []
+
+    def new_var(self):
+        self.count += 1
+        return self.count
+
+    def junction(self, kind, members):
+        # Литерал для ∨ (kind '|') или ∧ ('&') членов; вложенные того же вида сливаются
+        flat = {}
+        for member in members:
+            key = self.structure.get(member)
+            if key is not None and key[0] == kind:
+                flat.update(dict.fromkeys(key[1]))
+            else:
+                flat[member] = None
+        if len(flat) == 1:
+            return next(iter(flat))
+        key = (kind, tuple(sorted(flat)))
+        var = self.nodes.get(key)
+        if var is None:
+            var = self.nodes[key] = self.new_var()
+            self.structure[var] = key
+        return var
+
+    def nnf(self, expression, positive=True):
+        # Литерал NNF для expression (или его отрицания при positive=False).
+        # Обход без рекурсии; повторно встречающиеся объекты разбираются один раз
+        done = {}
+        stack = [(expression, positive)]
+        while stack:
+            node, positive = stack[-1]
+            if (id(node), positive) in done:
+                stack.pop()
+                continue
+            if isinstance(node, Variable):
+                number = self.atoms.get(node)
+                if number is None:
+                    number = self.atoms[node] = self.new_var()
+                done[id(node), positive] = number if positive else -number
+                stack.pop()
+                continue
+            if isinstance(node, Negation):
+                parts = ((node.expression, not positive),)
+            elif isinstance(node, Implication):
+                parts = ((node.antecedent, not positive), (node.consequent, positive))
+            else:
+                parts = ((node.left, positive), (node.right, positive))
+            pending = [part for part in parts if (id(part[0]), part[1]) not in done]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            members = [done[id(part), sign] for part, sign in parts]
+            if isinstance(node, Negation):
+                done[id(node), positive] = members[0]
+            else:
+                # ¬(A → B) = A ∧ ¬B, ¬(A ∨ B) = ¬A ∧ ¬B
+                done[id(node), positive] = self.junction('|' if positive else '&', members)
+        return done[id(expression), positive]
+
+    def define(self, literal):
+        # Добавляет определения для literal и всех его составных членов (один раз)
+        stack = [literal]
+        while stack:
+            var = stack.pop()
+            key = self.structure.get(var)
+            if key is None or var in self.defined:
+                continue
+            self.defined.add(var)
+            kind, members = key
+            if kind == '|':
+                self.definitions.append([-var, *members])
+            else:
+                self.definitions.extend([-var, member] for member in members)
+            stack.extend(members)
+        return literal
+
+    def add(self, premise, selector=None):
+        """
+        Дизъюнкты посылки (Expression) как списки литералов; определения копятся в definitions.
+        Если задан selector, к каждому дизъюнкту добавляется ¬selector.
+        """
+        guard = [] if selector is None else [-selector]
+        clauses = []
+        stack = [self.nnf(premise.content)]
+        while stack:
+            literal = stack.pop()
+            kind, members = self.structure.get(literal, (None, (literal,)))
+            if kind == '&':
+                stack.extend(reversed(members))
+            else:
+                clauses.append(guard + [self.define(member) for member in members])
+        return clauses
+
+    def names(self):
+        # Номер переменной -> имя для печати; определяющие переменные - d<номер>
+        names = {number: f"d{number}" for number in range(1, self.count + 1)}
+        names.update((number, repr(atom)) for atom, number in self.atoms.items())
+        return names
+
+
+def clause_repr(clause, names):
+    # names: номер переменной -> имя (CNF.names)
+    literals = [f"¬{names[-literal]}" if literal < 0 else names[literal]
+                for literal in sorted(clause, key=abs)]
+    return ' ∨ '.join(literals) if literals else '⊥'
+
+
+def is_tautology(clause):
+    # Дизъюнкт с X и ¬X истинен всегда и ничего не даёт резолюции
+    return any(-literal in clause for literal in clause)
+
+
+def signature(clause):
+    # 64-битная маска литералов: если C ⊆ D, то signature(C) & ~signature(D) == 0
+    mask = 0
+    for literal in clause:
+        mask |= 1 << ((2 * abs(literal) + (literal < 0)) & 63)
+    return mask
+
+
+class ClauseSet:
+    """
+    Множество дизъюнктов без поглощённых: дизъюнкт C поглощает D, если C ⊆ D.
+    Кандидаты отбираются по индексам литералов и сигнатурам, подмножество проверяется в конце.
+    """
+    def __init__(self):
+        self.signatures = {}
+        # Ключевой литерал (наименьший) -> дизъюнкты: для прямого поглощения
+        self.keys = {}
+        # Литерал -> все дизъюнкты с ним: для обратного поглощения
+        self.occurrences = {}
+
+    def __contains__(self, clause):
+        return clause in self.signatures
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def is_subsumed(self, clause):
+        # Есть ли дизъюнкт, являющийся подмножеством clause (в том числе равный ему)
+        mask = signature(clause)
+        for literal in clause:
+            for other in self.keys.get(literal, ()):
+                if self.signatures[other] & ~mask == 0 and other <= clause:
+                    return True
+        return False
+
+    def add(self, clause):
+        # Добавляет дизъюнкт и убирает поглощённые им; возвращает убранные
+        mask = signature(clause)
+        rarest = min(clause, key=lambda literal: len(self.occurrences.get(literal, ())))
+        removed = [other for other in self.occurrences.get(rarest, ())
+                   if mask & ~self.signatures[other] == 0 and clause <= other]
+        for other in removed:
+            self.remove(other)
+        self.signatures[clause] = mask
+        self.keys.setdefault(min(clause), {})[clause] = None
+        for literal in clause:
+            self.occurrences.setdefault(literal, {})[clause] = None
+        return removed
+
+    def remove(self, clause):
+        del self.signatures[clause]
+        del self.keys[min(clause)][clause]
+        for literal in clause:
+            del self.occurrences[literal][clause]
 
 
 def resolve(clause1, clause2):
     """
-    Применяет правило резолюции к двум дизъюнктам.
-    Возвращает новый дизъюнкт или None, если резолюция невозможна.
+    Применяет правило резолюции к двум дизъюнктам (frozenset целых литералов).
+    Возвращает список резольвент, по одной на каждую пару противоположных литералов,
+    без тавтологий.
     """
-    literals1 = set(extract_literals(clause1))  # Преобразуем в множество
-    literals2 = set(extract_literals(clause2))  # Преобразуем в множество
-    resolvent_found = False
-    new_literals = set()
-
-    for lit1 in literals1:
-        for lit2 in literals2:
-            if isinstance(lit1, Negation) and lit1.expression == lit2:
-                # Найдено противоположное утверждение
-                resolvent_found = True
-                new_literals = (literals1 - {lit1}) | (literals2 - {lit2})
-            elif isinstance(lit2, Negation) and lit2.expression == lit1:
-                # Найдено противоположное утверждение
-                resolvent_found = True
-                new_literals = (literals1 - {lit1}) | (literals2 - {lit2})
-
-    if not resolvent_found:
-        return None
+    resolvents = []
+    for literal in clause1:
+        if -literal in clause2:
+            resolvent = (clause1 - {literal}) | (clause2 - {-literal})
+            if not is_tautology(resolvent):
+                resolvents.append(resolvent)
+    return resolvents
 
-    # Формируем новый дизъюнкт
-    if not new_literals:  # Если пустой набор литералов, это противоречие
-        return Expression(Variable("⊥"))
 
-    new_clause = None
-    for lit in new_literals:
-        new_clause = Disjunction(new_clause, lit) if new_clause else lit
-
-    return new_clause
-
-
-
-
-def check_consistency(clauses):
+def resolution_consistency(clauses, support=None, verbose=False):
     """
     Проверяет противоречивость множества посылок с использованием метода резолюции.
+    Стратегия поддержки: резольвенты строятся только с участием посылок из support
+    и их потомков, поэтому остальные посылки должны быть совместны. По умолчанию
+    в support входят все посылки. Каждая пара дизъюнктов рассматривается один раз:
+    выбранный дизъюнкт резольвируется только с уже обработанными, которые находятся
+    по индексу литерал -> дизъюнкты. Тавтологии отбрасываются, а множество дизъюнктов
+    остаётся минимальным благодаря прямому и обратному поглощению.
     """
-    simplified_clauses = {clause.simplify().content for clause in clauses}
-
-    print("Начальные дизъюнкты:")
-    for clause in simplified_clauses:
-        print("  ", clause)
-
-    while True:
-        new_clauses = set()
-        clauses_list = list(simplified_clauses)
-
-        for i in range(len(clauses_list)):
-            for j in range(i+1,len(clauses_list)):
-                if i == j:
-                    continue
-                resolvent = resolve(clauses_list[i], clauses_list[j])
-                print(f"Резолюция между {clauses_list[i]} и {clauses_list[j]} -> {resolvent}")
-
-                # Если обнаружен пустой дизъюнкт, возвращаем True
-                if isinstance(resolvent, Expression) and isinstance(resolvent.content, Variable) and resolvent.content.name == "⊥":
-                    print("Обнаружено противоречие!")
+    cnf = CNF()
+    if support is None:
+        support = clauses
+    usable = [frozenset(clause) for premise in clauses if premise not in support for clause in cnf.add(premise)]
+    initial = [frozenset(clause) for premise in support for clause in cnf.add(premise)]
+    # Определения выполнимы вместе с любыми совместными посылками, поэтому их место - вне поддержки
+    usable.extend(frozenset(clause) for clause in cnf.definitions)
+    names = cnf.names()
+
+    if verbose:
+        print("Начальные дизъюнкты:")
+        for clause in usable + initial:
+            print("  ", clause_repr(clause, names))
+    if frozenset() in usable or frozenset() in initial:
+        return True
+
+    kept = ClauseSet()
+    # Обработанные дизъюнкты по литералам; очередь - по числу литералов, затем по порядку
+    index = {}
+    queue = []
+
+    def keep(clause):
+        # False, если дизъюнкт бесполезен; поглощённые им убираются отовсюду
+        if is_tautology(clause) or kept.is_subsumed(clause):
+            return False
+        for other in kept.add(clause):
+            for literal in other:
+                index.get(literal, {}).pop(other, None)
+        return True
+
+    def process(clause):
+        for literal in clause:
+            index.setdefault(literal, {})[clause] = None
+
+    for clause in usable:
+        if keep(clause):
+            process(clause)
+    for clause in initial:
+        if keep(clause):
+            heapq.heappush(queue, (len(clause), len(queue), clause))
+    counter = len(queue)
+
+    while queue:
+        _, _, given = heapq.heappop(queue)
+        if given not in kept:
+            continue
+        partners = {}
+        for literal in given:
+            partners.update(index.get(-literal, {}))
+        for other in partners:
+            if other not in kept:
+                continue
+            for resolvent in resolve(given, other):
+                if not resolvent:
+                    if verbose:
+                        print("Обнаружено противоречие:", clause_repr(given, names), "и", clause_repr(other, names))
                     return True
+                if keep(resolvent):
+                    heapq.heappush(queue, (len(resolvent), counter, resolvent))
+                    counter += 1
+        # Выбранный дизъюнкт мог оказаться поглощён собственной резольвентой
+        if given in kept:
+            process(given)
+
+    if verbose:
+        print("Противоречия не обнаружено, дизъюнктов:", len(kept))
+    return False
 
-                if resolvent is not None:
-                    new_clauses.add(resolvent)
-
-        if not new_clauses.difference(simplified_clauses):
-            print("Больше новых дизъюнктов нет.")
-            break
-
-        print("Новые дизъюнкты:")
-        for clause in new_clauses:
-            print("  ", clause)
-
-        simplified_clauses.update(new_clauses)
 
-    print("Противоречия не обнаружено.")
-    print(simplified_clauses)
-    return False
+def sat_consistency(clauses, verbose=False):
+    # (противоречивы ли, модель или None, противоречивое подмножество посылок или None)
+    cnf = CNF()
+    solver = Solver()
+    # Селектор s включает посылку: к её дизъюнктам добавлен ¬s; предположения - все селекторы
+    selectors = {}
+    count = 0
+    for premise in clauses:
+        selector = cnf.new_var()
+        selectors[selector] = premise
+        for clause in cnf.add(premise, selector):
+            solver.add_clause(clause)
+            count += 1
+    for clause in cnf.definitions:
+        solver.add_clause(clause)
+    solver.reserve(cnf.count)
+    satisfiable = solver.solve(list(selectors))
+    if verbose:
+        print(f"Переменных: {cnf.count}, дизъюнктов: {count + len(cnf.definitions)}, "
+              f"конфликтов: {solver.conflicts}")
+    if satisfiable:
+        return False, {atom: solver.model[number] for atom, number in cnf.atoms.items()}, None
+    failed = set(solver.core)
+    return True, None, [clause for selector, clause in selectors.items() if selector in failed]
+
+
+class Consistency:
+    # Итог check_consistency; истинен, если посылки противоречивы.
+    # Для method='sat' model - значения атомов (если совместны), core - посылки, уже противоречивые вместе
+    def __init__(self, inconsistent, model=None, core=None):
+        self.inconsistent = inconsistent
+        self.model = model
+        self.core = core
+
+    def __bool__(self):
+        return self.inconsistent
 
+    def __repr__(self):
+        if self.inconsistent:
+            return "противоречивы" + (f", ядро: {self.core}" if self.core is not None else "")
+        return "совместны" + (f", модель: {self.model}" if self.model is not None else "")
 
 
+def check_consistency(clauses, support=None, verbose=False, method='resolution'):
+    """
+    Проверяет противоречивость множества посылок. method: 'resolution' - насыщение
+    резолюцией (см. resolution_consistency), 'sat' - преобразование Цейтина и решатель CDCL,
+    который вместе с ответом даёт модель или противоречивое подмножество посылок.
+    """
+    if method == 'sat':
+        return Consistency(*sat_consistency(clauses, verbose))
+    if method == 'resolution':
+        return Consistency(resolution_consistency(clauses, support, verbose))
+    raise ValueError(f"неизвестный метод: {method}")
 
 
 # Пример
@@ -213,4 +442,6 @@ clauses = [
     Expression(Negation(C))         #not X3
 ]
 
-print("Противоречивы ли посылки?", check_consistency(clauses))
+if __name__ == '__main__':
+    print("Противоречивы ли посылки?", bool(check_consistency(clauses, verbose=True)))
+    print("Решатель SAT:", check_consistency(clauses, method='sat'))
@@ -0,0 +1,139 @@
+from formulas import Variable, Negation, Implication
+from unification import children
+
+# Дерево различения (discrimination tree) над схематическими формулами.
+# Элемент хранится по пути из символов прямого обхода формулы-ключа, переменная
+# заменяется на '*'. Поиск возвращает кандидатов, которые затем
+# проверяются точным сопоставлением (нелинейные переменные дерево не различает).
+# В каждом узле пути под ключом _JUMPS лежат узлы, где кончается подтерм,
+# начинающийся в этом узле (со счётчиком ключей), чтобы переменная запроса
+# перескакивала подтерм сразу, а не обходила всё поддерево.
+
+_JUMPS = 'jumps'
+
+
+def symbol(expr):
+    if isinstance(expr, Variable):
+        return '*'
+    if isinstance(expr, Implication):
+        return 'I'
+    if isinstance(expr, Negation):
+        return 'N'
+    return 'D'
+
+
+def preorder(expr):
+    result = []
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        result.append(node)
+        stack.extend(reversed(children(node)))
+    return result
+
+
+class DiscriminationTree:
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def insert(self, key, item=None):
+        # item хранится по пути формулы key (по умолчанию - сама формула)
+        if item is None:
+            item = key
+        terms = preorder(key)
+        path = [self.root]
+        for sub in terms:
+            path.append(path[-1].setdefault(symbol(sub), {}))
+        leaf = path[-1].setdefault(None, {})
+        if item in leaf:
+            return
+        leaf[item] = None
+        self.size += 1
+        for i, sub in enumerate(terms):
+            jumps = path[i].setdefault(_JUMPS, {})
+            end = path[i + sub.size]
+            entry = jumps.get(id(end))
+            if entry is None:
+                jumps[id(end)] = [end, 1]
+            else:
+                entry[1] += 1
+
+    def remove(self, key, item=None):
+        if item is None:
+            item = key
+        terms = preorder(key)
+        symbols = [symbol(sub) for sub in terms]
+        path = [self.root]
+        for sym in symbols:
+            node = path[-1].get(sym)
+            if node is None:
+                return
+            path.append(node)
+        leaf = path[-1].get(None)
+        if leaf is None or item not in leaf:
+            return
+        del leaf[item]
+        self.size -= 1
+        for i, sub in enumerate(terms):
+            jumps = path[i][_JUMPS]
+            entry = jumps[id(path[i + sub.size])]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del jumps[id(entry[0])]
+                if not jumps:
+                    del path[i][_JUMPS]
+        # Удаляем опустевшие ветви
+        if not leaf:
+            del path[-1][None]
+        for depth in range(len(symbols), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][symbols[depth - 1]]
+
+    def __len__(self):
+        return self.size
+
+    def _retrieve(self, query, stored_vars, query_vars):
+        # stored_vars: переменная в дереве покрывает любой подтерм запроса
+        # query_vars: переменная в запросе покрывает любой подтерм в дереве
+        terms = preorder(query)
+        stack = [(self.root, 0)]
+        result = []
+        while stack:
+            node, i = stack.pop()
+            if i == len(terms):
+                leaf = node.get(None)
+                if leaf:
+                    result.extend(leaf)
+                continue
+            sub = terms[i]
+            if isinstance(sub, Variable):
+                if query_vars:
+                    for child, _ in node.get(_JUMPS, {}).values():
+                        stack.append((child, i + 1))
+                    continue
+                child = node.get('*')
+                if child is not None:
+                    stack.append((child, i + 1))
+                continue
+            if stored_vars:
+                child = node.get('*')
+                if child is not None:
+                    stack.append((child, i + sub.size))
+            child = node.get(symbol(sub))
+            if child is not None:
+                stack.append((child, i + 1))
+        return result
+
+    def generalizations(self, query):
+        # Кандидаты s, для которых query может быть частным случаем s
+        return self._retrieve(query, True, False)
+
+    def instances(self, query):
+        # Кандидаты s, которые могут быть частными случаями query
+        return self._retrieve(query, False, True)
+
+    def unifiable(self, query):
+        # Кандидаты s, которые могут унифицироваться с query
+        return self._retrieve(query, True, True)
@@ -0,0 +1,49 @@
+from formula_parser import parse
+from task1 import Auto_proof
+
+
+def goal_directed_prover():
+    proofer = Auto_proof(goal_directed=True)
+    proofer.max_subgoal_size = 20
+    proofer.add_subgoal(parse('(A -> B) -> ((B -> C) -> (A -> C))'))
+    for _ in range(30):
+        proofer.step()
+    return proofer
+
+
+def open_link(proofer):
+    # Открытая подцель с большой посылкой, родитель которой ещё открыт
+    for goal, links in proofer.subgoals.items():
+        for parent, major in links:
+            if parent in proofer.subgoals and major is not None:
+                return goal, major
+    raise AssertionError('нет открытой подцели с большой посылкой')
+
+
+def close(proofer, goal):
+    # Подцель становится тождеством и закрывается
+    proofer.add_identity(goal)
+    proofer.record(goal, 'H', ())
+    return proofer.meet([goal])
+
+
+def test_resume_continues_identically(tmp_path):
+    path = str(tmp_path / 'state.bin')
+    live = goal_directed_prover()
+    live.save_checkpoint(path)
+    resumed = Auto_proof.resume(path, goal_directed=True)
+    assert list(resumed.subgoals.items()) == list(live.subgoals.items())
+    for _ in range(20):
+        assert live.step() == resumed.step()
+    assert list(resumed.identities) == list(live.identities)
+
+
+def test_resume_keeps_records_of_subsumed_majors(tmp_path):
+    # Большая посылка, убранная из хранилища поглощением, нужна meet() после восстановления
+    path = str(tmp_path / 'state.bin')
+    live = goal_directed_prover()
+    goal, major = open_link(live)
+    live.remove_identity(major)
+    live.save_checkpoint(path)
+    resumed = Auto_proof.resume(path, goal_directed=True)
+    assert close(resumed, goal) == close(live, goal)
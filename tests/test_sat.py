@@ -0,0 +1,95 @@
+import itertools
+import random
+
+from sat import Solver, luby
+
+
+def satisfies(clauses, assignment):
+    # assignment[v] - значение переменной v (индекс 0 не используется)
+    return all(any(assignment[abs(literal)] == (literal > 0) for literal in clause) for clause in clauses)
+
+
+def brute_force(clauses, count, assumptions=()):
+    for values in itertools.product((False, True), repeat=count):
+        assignment = (None,) + values
+        if satisfies(clauses, assignment) and satisfies([[literal] for literal in assumptions], assignment):
+            return True
+    return False
+
+
+def random_clauses(rng, count, number, width):
+    return [[rng.choice((1, -1)) * rng.randint(1, count) for _ in range(rng.randint(1, width))]
+            for _ in range(number)]
+
+
+def check_answer(solver, clauses, count, assumptions):
+    result = solver.solve(assumptions)
+    assert result == brute_force(clauses, count, assumptions)
+    if result:
+        assert satisfies(clauses, solver.model)
+        assert all(solver.model[abs(literal)] == (literal > 0) for literal in assumptions)
+    else:
+        # Ядро - подмножество предположений, уже несовместное с дизъюнктами
+        assert set(solver.core) <= set(assumptions)
+        assert not brute_force(clauses, count, solver.core)
+
+
+def test_luby():
+    assert [luby(k) for k in range(15)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+
+def test_random_formulas_match_brute_force():
+    rng = random.Random(1)
+    for _ in range(300):
+        count = rng.randint(1, 8)
+        clauses = random_clauses(rng, count, rng.randint(1, 30), 4)
+        solver = Solver()
+        for clause in clauses:
+            solver.add_clause(clause)
+        solver.reserve(count)
+        check_answer(solver, clauses, count, [])
+
+
+def test_assumptions_and_cores():
+    rng = random.Random(2)
+    for _ in range(300):
+        count = rng.randint(2, 8)
+        clauses = random_clauses(rng, count, rng.randint(1, 20), 3)
+        solver = Solver()
+        for clause in clauses:
+            solver.add_clause(clause)
+        # Несколько вызовов подряд: решатель сохраняет выученные дизъюнкты между ними
+        for _ in range(3):
+            variables = rng.sample(range(1, count + 1), rng.randint(1, count))
+            assumptions = [rng.choice((1, -1)) * var for var in variables]
+            check_answer(solver, clauses, count, assumptions)
+
+
+def test_clauses_added_between_calls():
+    rng = random.Random(3)
+    for _ in range(100):
+        count = rng.randint(2, 8)
+        solver = Solver()
+        solver.reserve(count)
+        clauses = []
+        for _ in range(5):
+            for clause in random_clauses(rng, count, rng.randint(1, 6), 3):
+                clauses.append(clause)
+                solver.add_clause(clause)
+            check_answer(solver, clauses, count, [])
+
+
+def test_learned_clause_deletion():
+    # Частые перезапуски и принудительная чистка выученных дизъюнктов между вызовами
+    rng = random.Random(4)
+    for _ in range(40):
+        count = 12
+        clauses = random_clauses(rng, count, 50, 3)
+        solver = Solver(restart_base=1)
+        for clause in clauses:
+            solver.add_clause(clause)
+        for _ in range(4):
+            variables = rng.sample(range(1, count + 1), 3)
+            assumptions = [rng.choice((1, -1)) * var for var in variables]
+            check_answer(solver, clauses, count, assumptions)
+            solver.reduce_learnts()
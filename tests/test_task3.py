@@ -0,0 +1,106 @@
+import itertools
+import random
+
+from task3 import (CNF, ClauseSet, Disjunction, Expression, Implication, Negation, Variable,
+                   check_consistency)
+
+ATOMS = [Variable(name) for name in "ABC"]
+
+
+def value(expression, assignment):
+    if isinstance(expression, Variable):
+        return assignment[expression]
+    if isinstance(expression, Negation):
+        return not value(expression.expression, assignment)
+    if isinstance(expression, Implication):
+        return not value(expression.antecedent, assignment) or value(expression.consequent, assignment)
+    return value(expression.left, assignment) or value(expression.right, assignment)
+
+
+def assignments(atoms):
+    for values in itertools.product((False, True), repeat=len(atoms)):
+        yield dict(zip(atoms, values))
+
+
+def consistent(premises):
+    return any(all(value(premise.content, assignment) for premise in premises)
+               for assignment in assignments(ATOMS))
+
+
+def random_formula(rng, depth):
+    if depth == 0 or rng.random() < 0.3:
+        return rng.choice(ATOMS)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return Negation(random_formula(rng, depth - 1))
+    if kind == 1:
+        return Implication(random_formula(rng, depth - 1), random_formula(rng, depth - 1))
+    return Disjunction(random_formula(rng, depth - 1), random_formula(rng, depth - 1))
+
+
+def random_premises(rng):
+    return [Expression(random_formula(rng, 3)) for _ in range(rng.randint(1, 4))]
+
+
+def test_cnf_is_equisatisfiable():
+    rng = random.Random(1)
+    for _ in range(300):
+        premises = random_premises(rng)
+        cnf = CNF()
+        clauses = [clause for premise in premises for clause in cnf.add(premise)] + cnf.definitions
+        satisfiable = False
+        for values in itertools.product((False, True), repeat=cnf.count):
+            if all(any(values[abs(literal) - 1] == (literal > 0) for literal in clause) for clause in clauses):
+                satisfiable = True
+                break
+        assert satisfiable == consistent(premises)
+
+
+def test_methods_match_brute_force():
+    rng = random.Random(2)
+    for _ in range(300):
+        premises = random_premises(rng)
+        expected = not consistent(premises)
+        assert bool(check_consistency(premises)) == expected
+        result = check_consistency(premises, method='sat')
+        assert bool(result) == expected
+        if expected:
+            # Ядро - подмножество посылок, противоречивое само по себе
+            assert all(any(premise is other for other in premises) for premise in result.core)
+            assert not consistent(result.core)
+        else:
+            assignment = {atom: result.model.get(atom, False) for atom in ATOMS}
+            assert all(value(premise.content, assignment) for premise in premises)
+
+
+def test_set_of_support():
+    # Если посылки вне поддержки совместны, ответ не зависит от поддержки
+    rng = random.Random(3)
+    checked = 0
+    while checked < 200:
+        premises = random_premises(rng)
+        support = rng.sample(premises, rng.randint(1, len(premises)))
+        if not consistent([premise for premise in premises if premise not in support]):
+            continue
+        assert bool(check_consistency(premises, support)) == (not consistent(premises))
+        checked += 1
+
+
+def test_clause_set_keeps_only_minimal_clauses():
+    rng = random.Random(4)
+    for _ in range(200):
+        kept = ClauseSet()
+        added = []
+        for _ in range(rng.randint(1, 30)):
+            clause = frozenset(rng.choice((1, -1)) * rng.randint(1, 5) for _ in range(rng.randint(1, 4)))
+            probe = frozenset(rng.choice((1, -1)) * rng.randint(1, 5) for _ in range(rng.randint(1, 4)))
+            assert kept.is_subsumed(probe) == any(other <= probe for other in kept.signatures)
+            if not kept.is_subsumed(clause):
+                removed = kept.add(clause)
+                assert all(clause <= other for other in removed)
+            added.append(clause)
+        clauses = list(kept.signatures)
+        assert len(kept) == len(clauses)
+        # Ни один оставшийся дизъюнкт не поглощает другой, а каждый добавленный поглощён оставшимся
+        assert not any(first <= second for first, second in itertools.permutations(clauses, 2))
+        assert all(any(other <= clause for other in clauses) for clause in added)
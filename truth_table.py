@@ -0,0 +1,66 @@
+from formulas import Variable, Negation, Implication
+from unification import children, variables
+
+# Таблицы истинности, упакованные в целые числа: бит r отвечает набору значений
+# с номером r (бит k номера - значение k-й переменной). Операции над целыми
+# Python выполняются машинными словами сразу для всех 2^n наборов.
+
+# Таблица - 2^n бит на каждую подформулу, поэтому проверять по ходу поиска
+# имеет смысл только формулы не более чем с MAX_VARIABLES переменными
+MAX_VARIABLES = 20
+
+
+def _column(k, rows):
+    # Столбец k-й переменной: блоки из 2^k нулей и 2^k единиц, размноженные удвоением
+    half = 1 << k
+    column = ((1 << half) - 1) << half
+    width = half << 1
+    while width < rows:
+        column |= column << width
+        width <<= 1
+    return column
+
+
+def evaluate(expr, columns, full):
+    # columns: переменная -> битовый столбец; full - все единицы
+    cache = {}
+    stack = [expr]
+    while stack:
+        node = stack[-1]
+        if node in cache:
+            stack.pop()
+            continue
+        if isinstance(node, Variable):
+            cache[node] = columns[node]
+            stack.pop()
+            continue
+        pending = [child for child in children(node) if child not in cache]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        if isinstance(node, Implication):
+            cache[node] = (full ^ cache[node.antecedent]) | cache[node.consequent]
+        elif isinstance(node, Negation):
+            cache[node] = full ^ cache[node.expression]
+        else:
+            cache[node] = cache[node.left] | cache[node.right]
+    return cache[expr]
+
+
+def truth_table(expr):
+    """
+    Таблица истинности формулы по всем 2^n наборам её переменных.
+    Возвращает (таблица, маска из 2^n единиц).
+    """
+    names = variables(expr)
+    rows = 1 << len(names)
+    full = (1 << rows) - 1
+    columns = {var: _column(k, rows) for k, var in enumerate(names)}
+    return evaluate(expr, columns, full), full
+
+
+def is_tautology(expr):
+    table, full = truth_table(expr)
+    return table == full
+
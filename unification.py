@@ -0,0 +1,213 @@
+from formulas import Variable, Negation, Implication, Disjunction
+
+# Унификация схематических формул: все переменные в тождествах считаются
+# метапеременными, вместо которых можно подставить любую формулу.
+# Подстановки треугольные: словарь переменная -> терм, в котором терм может
+# сам содержать связанные переменные; окончательный вид даёт apply().
+# Все обходы идут по явному стеку, так что глубина формул не ограничена стеком Python.
+
+
+def fresh_names():
+    # A, B, ..., Z, затем X27, X28, ...
+    for i in range(26):
+        yield chr(ord('A') + i)
+    i = 27
+    while True:
+        yield f"X{i}"
+        i += 1
+
+
+def children(expr):
+    if isinstance(expr, Implication):
+        return expr.antecedent, expr.consequent
+    if isinstance(expr, Negation):
+        return expr.expression,
+    if isinstance(expr, Disjunction):
+        return expr.left, expr.right
+    return ()
+
+
+def rebuild(expr, new_children):
+    # Тот же узел с другими потомками; неизменённые поддеревья переиспользуются
+    if isinstance(expr, Implication):
+        return Implication(*new_children)
+    if isinstance(expr, Negation):
+        return Negation(*new_children)
+    return Disjunction(*new_children)
+
+
+def variables(expr):
+    # Переменные формулы в порядке первого вхождения
+    result = {}
+    stack = [expr]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Variable):
+            result[node] = None
+        else:
+            stack.extend(reversed(children(node)))
+    return list(result)
+
+
+def walk(term, subst):
+    while isinstance(term, Variable) and term in subst:
+        term = subst[term]
+    return term
+
+
+def occurs(var, term, subst):
+    stack = [term]
+    while stack:
+        node = walk(stack.pop(), subst)
+        if node is var:
+            return True
+        stack.extend(children(node))
+    return False
+
+
+def unify(a, b, subst=None):
+    """
+    Наиболее общий унификатор формул a и b (с проверкой вхождения).
+    Возвращает треугольную подстановку или None, если унификация невозможна.
+    """
+    subst = {} if subst is None else dict(subst)
+    stack = [(a, b)]
+    while stack:
+        x, y = stack.pop()
+        x = walk(x, subst)
+        y = walk(y, subst)
+        if x is y:
+            continue
+        if isinstance(x, Variable):
+            if occurs(x, y, subst):
+                return None
+            subst[x] = y
+        elif isinstance(y, Variable):
+            if occurs(y, x, subst):
+                return None
+            subst[y] = x
+        elif type(x) is type(y):
+            stack.extend(zip(children(x), children(y)))
+        else:
+            return None
+    return subst
+
+
+def match(pattern, term, subst=None):
+    """
+    Одностороннее сопоставление: подстановка s, при которой s(pattern) == term,
+    или None. Переменные term считаются константами.
+    """
+    subst = {} if subst is None else dict(subst)
+    stack = [(pattern, term)]
+    while stack:
+        p, t = stack.pop()
+        if isinstance(p, Variable):
+            bound = subst.get(p)
+            if bound is None:
+                subst[p] = t
+            elif bound is not t:
+                return None
+        elif type(p) is type(t):
+            stack.extend(zip(children(p), children(t)))
+        else:
+            return None
+    return subst
+
+
+def apply(term, subst, cache=None):
+    # Применяет треугольную подстановку до конца; общие поддеревья обходятся один раз
+    if cache is None:
+        cache = {}
+    stack = [term]
+    while stack:
+        node = stack[-1]
+        if node in cache:
+            stack.pop()
+            continue
+        if isinstance(node, Variable):
+            bound = subst.get(node)
+            if bound is None:
+                cache[node] = node
+            elif bound in cache:
+                cache[node] = cache[bound]
+            else:
+                stack.append(bound)
+                continue
+            stack.pop()
+            continue
+        old = children(node)
+        pending = [child for child in old if child not in cache]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        new = tuple(cache[child] for child in old)
+        cache[node] = node if all(n is o for n, o in zip(new, old)) else rebuild(node, new)
+    return cache[term]
+
+
+def rename(term, renaming, cache=None):
+    # Одновременная подстановка (в отличие от apply, связанные термы не раскрываются повторно),
+    # поэтому допустимы перестановки вида {A: B, B: A}
+    if cache is None:
+        cache = {}
+    stack = [term]
+    while stack:
+        node = stack[-1]
+        if node in cache:
+            stack.pop()
+            continue
+        if isinstance(node, Variable):
+            cache[node] = renaming.get(node, node)
+            stack.pop()
+            continue
+        old = children(node)
+        pending = [child for child in old if child not in cache]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        new = tuple(cache[child] for child in old)
+        cache[node] = node if all(n is o for n, o in zip(new, old)) else rebuild(node, new)
+    return cache[term]
+
+
+def rename_apart(expr, other):
+    # Переименовывает переменные expr, совпадающие с переменными other
+    taken = set(variables(other))
+    own = variables(expr)
+    clashes = [v for v in own if v in taken]
+    if not clashes:
+        return expr
+    taken.update(own)
+    names = (name for name in fresh_names() if Variable(name) not in taken)
+    renaming = {v: Variable(next(names)) for v in clashes}
+    return rename(expr, renaming)
+
+
+def canonical(expr):
+    # Переименовывает переменные в порядке первого вхождения: A, B, C, ...
+    # Формулы, отличающиеся только именами переменных, дают один и тот же узел
+    renaming = {}
+    for var, name in zip(variables(expr), fresh_names()):
+        new = Variable(name)
+        if new is not var:
+            renaming[var] = new
+    if not renaming:
+        return expr
+    return rename(expr, renaming)
+
+
+def condensed_detachment(major, minor):
+    """
+    Modus ponens с унификацией: из major = (P → Q) и minor, унифицируемой с P,
+    выводит наиболее общий частный случай Q. Возвращает None, если правило не применимо.
+    """
+    if not isinstance(major, Implication):
+        return None
+    minor = rename_apart(minor, major)
+    subst = unify(major.antecedent, minor)
+    if subst is None:
+        return None
+    return apply(major.consequent, subst)